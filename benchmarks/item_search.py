@@ -0,0 +1,53 @@
+import argparse
+import time
+from core.manager.items_manager import load_from_file
+from core.manager.items_search import ItemNameIndex
+from core.manager.items_writer import generate_items
+
+def measure(func, queries, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for query in queries:
+            func(query)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries)
+
+def scan(db, name):
+    # What lookups did before the index, the first item with that exact name
+    return next((item.id for item in db.items.values() if item.name == name), None)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare a linear scan for an item name against the name index.")
+    parser.add_argument("--file", default=None, help="items.dat to load, otherwise one is generated")
+    parser.add_argument("--items", type=int, default=20000, help="size of the generated database")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    db = load_from_file(args.file) if args.file else generate_items(args.items)
+    start = time.perf_counter()
+    index = ItemNameIndex(db)
+    build_time = time.perf_counter() - start
+
+    # Names spread over the whole database, so the scan does not always stop early
+    names = [db.items[item_id].name for item_id in range(0, db.item_count, max(1, db.item_count // 50))]
+    if any(index.find(name) != scan(db, name) for name in names):
+        raise SystemExit("The index disagrees with a scan")
+    prefixes = [name[:len(name) // 2 + 1] for name in names]
+    # One dropped letter per name for the fuzzy path
+    typos = [name[:len(name) // 2] + name[len(name) // 2 + 1:] for name in names]
+
+    scan_time = measure(lambda name: scan(db, name), names, args.rounds)
+    exact_time = measure(index.find, names, args.rounds)
+    folded_time = measure(index.find, [name.upper() for name in names], args.rounds)
+    prefix_time = measure(index.search, prefixes, args.rounds)
+    fuzzy_time = measure(index.search, typos, args.rounds)
+    # Share of the typos that still find an item with the name they were made from
+    found = sum(any(db.items[item_id].name == name for item_id in index.search(typo)) for name, typo in zip(names, typos)) / len(names)
+
+    print(f"database: {db.item_count} items, {len(index.sorted)} distinct names, index built in {build_time * 1000:.1f} ms")
+    print(f"scan:     {scan_time * 1e6:.1f} us")
+    print(f"exact:    {exact_time * 1e6:.2f} us ({scan_time / exact_time:.0f}x faster than a scan)")
+    print(f"folded:   {folded_time * 1e6:.2f} us")
+    print(f"prefix:   {prefix_time * 1e6:.1f} us")
+    print(f"fuzzy:    {fuzzy_time * 1e6:.1f} us ({found:.0%} of typos find their item)")
\ No newline at end of file
@@ -0,0 +1,73 @@
+import argparse
+import os
+import tempfile
+import time
+from core.manager.items_cache import cache_path, file_key, load_cache, save_cache
+from core.manager.items_columns import ItemColumns, columns_path, write_columns
+from core.manager.items_lazy import LazyItemDatabase
+from core.manager.items_manager import load_from_memory, load_from_memory_reference
+from core.manager.items_writer import generate_items, serialize_items
+
+def measure(func, data, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def same_database(a, b):
+    return a.version == b.version and a.item_count == b.item_count and a.items == b.items
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the struct based items.dat loader against the field by field reference reader, the lazy index, the parsed cache and the mapped columns.")
+    parser.add_argument("--file", default=None, help="items.dat to load, otherwise one is generated")
+    parser.add_argument("--items", type=int, default=20000, help="size of the generated database")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies --items, e.g. 2 or 10 for a catalogue that many times larger")
+    parser.add_argument("--version", type=int, default=24, help="version of the generated database")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "rb") as f:
+            data = f.read()
+    else:
+        data = serialize_items(generate_items(int(args.items * args.scale), args.version))
+
+    reference = load_from_memory_reference(data)
+    if not same_database(reference, load_from_memory(data)):
+        raise SystemExit("The loaders disagree on this items.dat")
+    if not same_database(reference, load_from_memory(serialize_items(reference))):
+        raise SystemExit("The writer does not round-trip this items.dat")
+
+    reference_time = measure(load_from_memory_reference, data, args.rounds)
+    fast_time = measure(load_from_memory, data, args.rounds)
+
+    lazy = LazyItemDatabase(data)
+    if any(lazy.get_item(item_id) != item for item_id, item in reference.items.items()):
+        raise SystemExit("The lazy loader disagrees on this items.dat")
+    lazy_time = measure(LazyItemDatabase, data, args.rounds)
+
+    with tempfile.TemporaryDirectory() as directory:
+        items_path = os.path.join(directory, "items.dat")
+        with open(items_path, "wb") as f:
+            f.write(data)
+        save_cache(reference, cache_path(items_path), None, file_key(items_path))
+        if not same_database(reference, load_cache(cache_path(items_path), None, file_key(items_path))):
+            raise SystemExit("The parsed cache disagrees with this items.dat")
+        cache_time = measure(lambda path: load_cache(cache_path(path), None, file_key(path)), items_path, args.rounds)
+
+        write_columns(reference, columns_path(items_path), None, file_key(items_path))
+        columns = ItemColumns(columns_path(items_path))
+        if any(columns.get_item(item_id).to_item() != item for item_id, item in reference.items.items()):
+            raise SystemExit("The columns file disagrees with this items.dat")
+        columns.close()
+        columns_time = measure(lambda path: ItemColumns(path).close(), columns_path(items_path), args.rounds)
+
+    print(f"items.dat:  version {reference.version}, {reference.item_count} items, {len(data) / 1024 / 1024:.1f} MiB")
+    print(f"reference:  {reference_time * 1000:.1f} ms")
+    print(f"struct:     {fast_time * 1000:.1f} ms")
+    print(f"speedup:    {reference_time / fast_time:.1f}x")
+    print(f"lazy index: {lazy_time * 1000:.1f} ms ({fast_time / lazy_time:.1f}x faster than struct)")
+    print(f"warm cache: {cache_time * 1000:.1f} ms ({fast_time / cache_time:.1f}x faster than struct)")
+    print(f"columns:    {columns_time * 1000:.3f} ms to map")
\ No newline at end of file
@@ -0,0 +1,83 @@
+import argparse
+import subprocess
+import sys
+import time
+from core.utils import find_class_text, find_input_value, find_onclick_links
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+ONCLICKS = ("optionChose('Apple');", "optionChose('Google');", "optionChose('Grow');")
+
+def filler(count):
+    return "".join(
+        f'<div class="row"><p class="text-muted">Paragraph {i} &amp; some <b>bold</b> text.</p>'
+        f'<img src="/img/{i}.png" alt="image {i}"><a href="/help/{i}">Help {i}</a></div>\n'
+        for i in range(count)
+    )
+
+def dashboard_page(count):
+    links = "".join(f'<a href="https://login.growtopiagame.com/{name}?token=abc{i}" onclick="{onclick}">{name}</a>\n' for i, (name, onclick) in enumerate(zip(("apple", "google", "grow"), ONCLICKS)))
+    return f"<!DOCTYPE html><html><head><title>Dashboard</title><script>var x = '<a>';</script></head><body>{filler(count)}{links}{filler(count)}</body></html>"
+
+def login_page(count):
+    return f'<!DOCTYPE html><html><head><title>Login</title></head><body>{filler(count)}<form method="post"><input type="hidden" name="_token" value="t0k3n&amp;value"><input name="growId"></form>{filler(count)}</body></html>'
+
+def error_page(count):
+    return f'<html><body>{filler(count)}<div class="alert text-danger-wrapper"> <span> Account </span> <b>not</b> found. </div>{filler(count)}</body></html>'
+
+def soup_results(dashboard, login, error):
+    soup = BeautifulSoup(dashboard, "html.parser")
+    links = {}
+    for onclick in ONCLICKS:
+        link = soup.find("a", onclick=onclick)
+        links[onclick] = link["href"] if link else None
+
+    token_input = BeautifulSoup(login, "html.parser").find("input", {"name": "_token"})
+    error_div = BeautifulSoup(error, "html.parser").find("div", class_="text-danger-wrapper")
+    return links, token_input["value"], error_div.get_text(strip=True)
+
+def extractor_results(dashboard, login, error):
+    return (
+        find_onclick_links(dashboard, ONCLICKS),
+        find_input_value(login, "_token"),
+        find_class_text(error, "div", "text-danger-wrapper"),
+    )
+
+def import_time(module):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+    return time.perf_counter() - start
+
+def measure(func, args, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(*args)
+    return (time.perf_counter() - start) / rounds
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the streaming HTML extractor against BeautifulSoup on login pages.")
+    parser.add_argument("--filler", type=int, default=200, help="filler rows around the interesting elements")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    if BeautifulSoup is None:
+        raise SystemExit("This benchmark needs beautifulsoup4 for the baseline: pip install beautifulsoup4")
+
+    pages = (dashboard_page(args.filler), login_page(args.filler), error_page(args.filler))
+    expected = soup_results(*pages)
+    actual = extractor_results(*pages)
+    if expected != actual:
+        raise SystemExit(f"Results differ:\n  bs4:       {expected}\n  extractor: {actual}")
+
+    soup_time = measure(soup_results, pages, args.rounds)
+    extractor_time = measure(extractor_results, pages, args.rounds)
+
+    print(f"page sizes:    {', '.join(f'{len(page) // 1024} KiB' for page in pages)}")
+    print(f"BeautifulSoup: {soup_time * 1000:.2f} ms per login")
+    print(f"extractor:     {extractor_time * 1000:.2f} ms per login")
+    print(f"speedup:       {soup_time / extractor_time:.1f}x")
+    print(f"cold start with bs4:         {import_time('bs4') * 1000:.0f} ms")
+    print(f"cold start with html.parser: {import_time('html.parser') * 1000:.0f} ms")
\ No newline at end of file
@@ -1 +1,2 @@
-from .app import Bot
\ No newline at end of file
+from .app import Bot
+from .fleet import Fleet
\ No newline at end of file
@@ -1,15 +1,27 @@
+import asyncio
 import ctypes
-from core.ffi import enet_host_create, enet_host_use_crc32, enet_host_use_new_packet, enet_host_compress_with_range_coder, ENetAddress, enet_address_set_host, enet_host_connect, enet_host_service, ENetEvent, ENetEventType, ENetPacket, enet_packet_create, enet_peer_disconnect, enet_peer_send, enet_packet_destroy
+import random
+import time
+from core.ffi import ENetAddress, enet_address_set_host, enet_host_connect, ENetEventType, ENetPacket, enet_packet_view, enet_peer_disconnect, enet_peer_disconnect_now, enet_packet_destroy
+from .fleet import Fleet
 from .inventory import Inventory
 from .login_info import LoginInfo
 from .login import fetch_login_urls, login_via_growid
+from .ping import PingTracker
+from .send_queue import SendQueue
 from .server_data import fetch_server_data
-from core.entities.enums import LoginMethod, NetMessage
+from core.entities.enums import ConnectionState, LoginMethod, NetMessage
 from core.handlers import NetMessageHandler
 from core.manager import World
+from core.utils import CaptureWriter, INBOUND, Metrics, bot_context, get_logger
+
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+log = get_logger("bot")
 
 class Bot:
-    def __init__(self, login_method=LoginMethod.LEGACY, username=None, password=None, items_database=None):
+    def __init__(self, login_method=LoginMethod.LEGACY, username=None, password=None, items_database=None, fleet=None, rate_limits=None, capture=None, cache_dir="cache", server=None):
         if login_method is LoginMethod.LEGACY and (username is None or password is None):
             raise ValueError("Username and password must be provided for LEGACY login method.")
 
@@ -21,90 +33,199 @@ class Bot:
         self.password = password
         self.login_info = LoginInfo()
         self.login_urls = None
-        self.items_database = items_database
+        # (address, port) to connect to directly, skipping the HTTP bootstrap
+        self.server = server
+        self.cache_dir = cache_dir
         self.inventory = Inventory()
         self.world = World.new()
         self.peer = None
-        self.host = enet_host_create(None, 1, 2, 0, 0)
+        self.clock = time.monotonic
+        self.state = ConnectionState.Disconnected
+        self.state_since = self.clock()
+        self.state_times = {state: 0.0 for state in ConnectionState}
+        self.failures = 0
+        self.stopping = False
+        self.capture = CaptureWriter(capture) if capture is not None else None
+        self.metrics = Metrics()
+        self.ping = PingTracker(self.clock)
+        self.send_queue = SendQueue(rate_limits=rate_limits, clock=self.clock, capture=self.capture, metrics=self.metrics, ping=self.ping)
+        # Background items.dat ingest started by SendItemDatabaseData, if any
+        self.items_ingest = None
+        self.fleet = fleet if fleet is not None else Fleet(1)
+        self.fleet.add_bot(self)
+        self.host = self.fleet.host
+
+        if items_database is not None:
+            self.items_database = items_database
+
+    @property
+    def items_database(self):
+        return self.fleet.items_database
+
+    @items_database.setter
+    def items_database(self, items_database):
+        self.fleet.items_database = items_database
+
+    def set_state(self, state):
+        now = self.clock()
+        self.state_times[self.state] += now - self.state_since
+        self.state = state
+        self.state_since = now
+
+    def state_durations(self):
+        durations = dict(self.state_times)
+        durations[self.state] += self.clock() - self.state_since
+        return durations
+
+    def snapshot(self):
+        return {
+            "state": self.state.name,
+            "state_durations": {state.name: seconds for state, seconds in self.state_durations().items()},
+            "send_queue": self.send_queue.stats(),
+            "ping": self.ping.snapshot(),
+            "health": self.health(),
+            "metrics": self.metrics.snapshot(),
+        }
+
+    def health(self):
+        if self.state is not ConnectionState.InGame:
+            return 0.0
+        return self.ping.health()
+
+    async def connect(self):
+        bot_context.set(self.username)
+        self.stopping = False
+        while not self.stopping:
+            if self.state is not ConnectionState.Redirecting:
+                self.set_state(ConnectionState.Resolving)
+
+            try:
+                enet_addr = await self.resolve()
+            except Exception as e:
+                log.error("Failed to resolve the server: %s", e)
+                enet_addr = None
+            if enet_addr is None:
+                await self.backoff()
+                continue
+
+            self.set_state(ConnectionState.Connecting)
+            self.peer = enet_host_connect(self.host, ctypes.byref(enet_addr), 2, 0)
+            if self.peer is None:
+                log.error("Failed to create a connection to the server.")
+                await self.backoff()
+                continue
 
-        if self.host is None:
-            print("An error occurred while trying to create an ENet client host.")
-            return
+            try:
+                await self.fleet.attach(self)
+            except Exception as e:
+                # The fleet already logged the traceback, the session is gone either way
+                log.error("Session failed: %s", e)
+                if not self.stopping:
+                    await self.backoff()
+                continue
 
-        enet_host_use_new_packet(self.host)
-        enet_host_use_crc32(self.host)
-        enet_host_compress_with_range_coder(self.host)
+            if self.state is ConnectionState.Redirecting:
+                log.info("Redirecting to redirected server...")
+            elif not self.stopping:
+                await self.backoff()
 
-    def connect(self):
+        self.set_state(ConnectionState.Disconnected)
+        if self.capture is not None:
+            self.capture.flush()
+
+    async def backoff(self):
+        self.set_state(ConnectionState.Backoff)
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** self.failures) * random.uniform(0.5, 1.0)
+        self.failures += 1
+        log.info("Reconnecting in %.1fs.", delay)
+        await asyncio.sleep(delay)
+
+    async def resolve(self):
         if self.redirected:
-            enet_addr = ENetAddress()
-            if enet_address_set_host(ctypes.byref(enet_addr), self.address.encode('utf-8')) != 0:
-                print("Failed to set host address.")
-                return
-            enet_addr.port = int(self.port)
+            address, port = self.address, self.port
+        elif self.server is not None:
+            address, port = self.server
         else:
-            server_data = fetch_server_data(self.login_info.protocol, self.login_info.game_version)
+            server_data = await asyncio.to_thread(fetch_server_data, self.login_info.protocol, self.login_info.game_version)
+            if server_data is None:
+                return None
             self.login_info.meta = server_data['meta']
-            self.login_urls = fetch_login_urls(self.login_info.build())
-            self.login_info.ltoken = login_via_growid(self.login_urls['growtopia'], self.username, self.password)
-
-            enet_addr = ENetAddress()
-            if enet_address_set_host(ctypes.byref(enet_addr), server_data['server'].encode('utf-8')) != 0:
-                print("Failed to set host address.")
-                return
-            enet_addr.port = int(server_data['port'])
-
-        self.peer = enet_host_connect(self.host, ctypes.byref(enet_addr), 2, 0)
-        if self.peer is None:
-            print("Failed to create a connection to the server.")
-        
-        self.loop()
-
-    def loop(self):
-        event = ENetEvent()
-        while True:
-            if enet_host_service(self.host, ctypes.byref(event), 250) > 0:
-                match event.type:
-                    case ENetEventType.CONNECT:
-                        print("Connected to server.")
-                    case ENetEventType.RECEIVE:
-                        packet = ctypes.cast(event.packet, ctypes.POINTER(ENetPacket)).contents
-                        NetMessageHandler.handle(self, packet)
-                        enet_packet_destroy(event.packet)
-                    case ENetEventType.DISCONNECT:
-                        print("Disconnected from server.")
-                        if self.redirected:
-                            print("Redirecting to redirected server...")
-                        self.connect()
-                        break
-                    case ENetEventType.DISCONNECT_TIMEOUT:
-                        print("Connection timed out.")
-                        break
+            self.login_urls = await asyncio.to_thread(fetch_login_urls, self.login_info.build())
+            if self.login_urls is None or self.login_urls['growtopia'] is None:
+                log.error("No GrowID login URL.")
+                return None
+            self.login_info.ltoken = await asyncio.to_thread(login_via_growid, self.login_urls['growtopia'], self.username, self.password)
+            if self.login_info.ltoken is None:
+                log.error("GrowID login failed.")
+                return None
+            address, port = server_data['server'], server_data['port']
+
+        enet_addr = ENetAddress()
+        if enet_address_set_host(ctypes.byref(enet_addr), address.encode('utf-8')) != 0:
+            log.error("Failed to set host address %s.", address)
+            return None
+        enet_addr.port = int(port)
+
+        return enet_addr
+
+    async def handle_event(self, event):
+        match event.type:
+            case ENetEventType.CONNECT:
+                log.info("Connected to server.")
+                self.set_state(ConnectionState.LoggingIn)
+            case ENetEventType.RECEIVE:
+                packet = ctypes.cast(event.packet, ctypes.POINTER(ENetPacket)).contents
+                data = enet_packet_view(packet)
+                if self.capture is not None:
+                    self.capture.write(INBOUND, data)
+                try:
+                    await NetMessageHandler.handle(self, data)
+                finally:
+                    data.release()
+                    enet_packet_destroy(event.packet)
+
+                # A redirect drops the peer on the spot, so no disconnect event will follow
+                if self.state is ConnectionState.Redirecting:
+                    return True
+            case ENetEventType.DISCONNECT:
+                log.info("Disconnected from server.")
+                self.send_queue.clear()
+                self.ping.reset()
+                return True
+            case ENetEventType.DISCONNECT_TIMEOUT:
+                log.warning("Connection timed out.")
+                self.send_queue.clear()
+                self.ping.reset()
+                return True
+
+    def enter_game(self):
+        self.send_packet(NetMessage.GenericText, "action|enter_game\n")
+        self.redirected = False
+        self.failures = 0
+        self.set_state(ConnectionState.InGame)
+
+    def redirect(self, address, port):
+        self.redirected = True
+        self.address = address
+        self.port = port
+        self.send_queue.clear()
+        self.ping.reset()
+        self.set_state(ConnectionState.Redirecting)
+        enet_peer_disconnect_now(self.peer, 0)
 
     def disconnect(self):
         enet_peer_disconnect(self.peer, 0)
 
+    def stop(self):
+        self.stopping = True
+        if self.peer in self.fleet.sessions:
+            self.disconnect()
+
     def send_packet(self, packet_type, data):
-        packet = enet_packet_create(None, 4 + len(data), 1)
-        packet_type_ptr = ctypes.cast(packet.contents.data, ctypes.POINTER(ctypes.c_uint32))
-        packet_type_ptr[0] = packet_type.value
-        data_start = ctypes.addressof(packet.contents.data.contents) + 4
-        ctypes.memmove(data_start, data.encode("utf-8"), len(data))
-        if enet_peer_send(self.peer, 0, packet) < 0:
-            print("Failed to send packet.")
-        else:
-            print(f"Sent packet of type: {packet_type.name}")
+        self.send_queue.push(packet_type, data.encode("utf-8"))
 
     def send_packet_raw(self, tank_packet):
-        packet = enet_packet_create(None, 4 + ctypes.sizeof(tank_packet) + tank_packet.extended_data_length, 1)
-        packet_type_ptr = ctypes.cast(packet.contents.data, ctypes.POINTER(ctypes.c_uint32))
-        packet_type_ptr[0] = NetMessage.GamePacket.value
-        data_start = ctypes.addressof(packet.contents.data.contents) + 4
-        ctypes.memmove(data_start, ctypes.byref(tank_packet), ctypes.sizeof(tank_packet))
-        if enet_peer_send(self.peer, 0, packet) < 0:
-            print("Failed to send raw packet.")
-        else:
-            print("Sent raw packet successfully.")
+        self.send_queue.push(NetMessage.GamePacket, tank_packet)
 
     def warp(self, world_name: str):
         self.send_packet(NetMessage.GameMessage, f"action|join_request\nname|{world_name}\ninvitedWorld|0\n")
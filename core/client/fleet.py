@@ -0,0 +1,158 @@
+import asyncio
+import ctypes
+import time
+from core.ffi import enet_host_create, enet_host_use_crc32, enet_host_use_new_packet, enet_host_compress_with_range_coder, enet_host_flush, enet_host_service, enet_host_socket, enet_packet_destroy, enet_peer_disconnect_now, ENetEvent, ENetEventType
+from core.entities.enums import ConnectionState
+from core.utils import SERVICE_SECONDS, Metrics, bot_context, get_logger, render, serve_metrics
+
+# Upper bound on how long the socket may sit idle before ENet gets serviced for resends and keepalives
+SERVICE_INTERVAL = 0.05
+# Bots scoring below this are reported as degraded
+DEGRADED_HEALTH = 0.5
+
+log = get_logger("fleet")
+
+class Fleet:
+    def __init__(self, peer_count=1, items_database=None, new_packet=True):
+        self.peer_count = peer_count
+        self.items_database = items_database
+        self.bots = []
+        self.sessions = {}
+        self.task = None
+        self.metrics = Metrics()
+        self.metrics_server = None
+        self.host = enet_host_create(None, peer_count, 2, 0, 0)
+
+        if self.host is None:
+            log.error("An error occurred while trying to create an ENet client host.")
+            return
+
+        # The stand-in server in core.server speaks the classic ENet header, so local runs turn this off
+        if new_packet:
+            enet_host_use_new_packet(self.host)
+        enet_host_use_crc32(self.host)
+        enet_host_compress_with_range_coder(self.host)
+
+    def __len__(self):
+        return len(self.bots)
+
+    def add_bot(self, bot):
+        if len(self.bots) >= self.peer_count:
+            raise ValueError(f"Fleet is full, it only has {self.peer_count} peer slots.")
+        self.bots.append(bot)
+
+    async def connect(self):
+        await asyncio.gather(*(bot.connect() for bot in self.bots), return_exceptions=True)
+
+    async def attach(self, bot):
+        peer = bot.peer
+        session = (bot, asyncio.get_running_loop().create_future())
+        self.sessions[peer] = session
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+        try:
+            return await session[1]
+        finally:
+            # Still here only when the awaiting bot was cancelled, the loop must not keep answering for it
+            if self.sessions.get(peer) is session:
+                del self.sessions[peer]
+                enet_peer_disconnect_now(peer, 0)
+
+    async def run(self):
+        event = ENetEvent()
+        readable = asyncio.Event()
+        event_loop = asyncio.get_running_loop()
+        socket = enet_host_socket(self.host)
+
+        try:
+            event_loop.add_reader(socket, readable.set)
+            watching = True
+        except NotImplementedError:
+            # Proactor event loops have no readiness callbacks, fall back to plain polling
+            watching = False
+
+        try:
+            while self.sessions:
+                while self.service(event) > 0:
+                    await self.dispatch(event)
+
+                self.flush()
+
+                readable.clear()
+                try:
+                    await asyncio.wait_for(readable.wait(), SERVICE_INTERVAL)
+                except TimeoutError:
+                    pass
+        except Exception as e:
+            # Every bot waits on this loop, fail their sessions rather than leave them waiting forever
+            log.exception("Fleet loop failed, dropping every session.")
+            for peer, (bot, closed) in self.sessions.items():
+                enet_peer_disconnect_now(peer, 0)
+                if not closed.done():
+                    closed.set_exception(e)
+            self.sessions.clear()
+        finally:
+            if watching:
+                event_loop.remove_reader(socket)
+
+    def service(self, event):
+        start = time.perf_counter()
+        result = enet_host_service(self.host, ctypes.byref(event), 0)
+        self.metrics.observe(SERVICE_SECONDS, (), time.perf_counter() - start)
+        return result
+
+    def flush(self):
+        sent = 0
+        for bot, _ in self.sessions.values():
+            sent += bot.send_queue.flush(bot.peer)
+
+        if sent > 0:
+            enet_host_flush(self.host)
+
+    async def dispatch(self, event):
+        session = self.sessions.get(event.peer)
+        if session is None:
+            if event.type == ENetEventType.RECEIVE:
+                enet_packet_destroy(event.packet)
+            return
+
+        bot, closed = session
+        bot_context.set(bot.username)
+        try:
+            finished = await bot.handle_event(event)
+        except Exception as e:
+            # A failing bot must not take the rest of the fleet down with it
+            log.exception("Handler failed, dropping the session.")
+            del self.sessions[event.peer]
+            # Reset rather than disconnected gracefully, nothing services the peer once its session is gone and the bot reconnects with a fresh one
+            enet_peer_disconnect_now(event.peer, 0)
+            if not closed.done():
+                closed.set_exception(e)
+            return
+
+        if finished:
+            del self.sessions[event.peer]
+            if not closed.done():
+                closed.set_result(None)
+
+    def snapshot(self):
+        return {
+            "sessions": len(self.sessions),
+            "metrics": self.metrics.snapshot(),
+            "bots": {bot.username: bot.snapshot() for bot in self.bots},
+        }
+
+    def health(self):
+        return {bot.username: bot.health() for bot in self.bots}
+
+    def degraded(self, threshold=DEGRADED_HEALTH):
+        return [bot for bot in self.bots if bot.state is ConnectionState.InGame and bot.health() < threshold]
+
+    def render_metrics(self):
+        return render([((), self.metrics)] + [((("bot", bot.username),), bot.metrics) for bot in self.bots])
+
+    async def serve_metrics(self, host="127.0.0.1", port=9100):
+        self.metrics_server = await serve_metrics(self.render_metrics, host, port)
+        return self.metrics_server
\ No newline at end of file
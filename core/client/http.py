@@ -0,0 +1,16 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) timeout in seconds for every bootstrap request
+TIMEOUT = (5, 15)
+
+# One connection pool per process, shared by every bot so keep-alive connections get reused
+adapter = HTTPAdapter(pool_connections=8, pool_maxsize=64)
+
+def new_session() -> requests.Session:
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+session = new_session()
\ No newline at end of file
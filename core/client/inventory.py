@@ -16,7 +16,7 @@ class Inventory:
     def __iter__(self):
         return iter(self.items.values())
 
-    def parse(self, data: bytes) -> None:
+    def parse(self, data: bytes | memoryview) -> None:
         self.reset()
         reader = PacketReader(data)
 
@@ -1,51 +1,69 @@
 import requests
 import time
-from bs4 import BeautifulSoup
 from urllib.parse import quote
+from core.utils import find_class_text, find_input_value, find_onclick_links, get_logger
+from .http import TIMEOUT, new_session
 
+log = get_logger("login")
+
+RETRY_DELAY = 5
+FETCH_ATTEMPTS = 3
+LOGIN_OPTIONS = {
+    "apple": "optionChose('Apple');",
+    "google": "optionChose('Google');",
+    "growtopia": "optionChose('Grow');",
+}
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36 Edg/143.0.0.0"
 
 def login_via_growid(url, username, password):
-    session = requests.Session()
+    session = new_session()
     session.headers.update({"User-Agent": USER_AGENT})
 
-    response = session.get(url)
+    try:
+        response = session.get(url, timeout=TIMEOUT)
+    except requests.RequestException as e:
+        log.warning("Request failed: %s", e)
+        return
+
     if response.status_code != 200:
-        print(f"Failed to access {url}, status code: {response.status_code}")
+        log.warning("Failed to access %s, status code: %d", url, response.status_code)
         return
     
-    soup = BeautifulSoup(response.text, "html.parser")
-    token_input = soup.find('input', {'name': '_token'})
-    if not token_input:
-        print("_token not found on the login page.")
+    token = find_input_value(response.text, "_token")
+    if token is None:
+        log.warning("_token not found on the login page.")
         return
 
-    response = session.post(
-        "https://login.growtopiagame.com/player/growid/login/validate",
-        data={
-            "growId": username,
-            "password": password,
-            "_token": token_input['value']
-        }
-    )
+    try:
+        response = session.post(
+            "https://login.growtopiagame.com/player/growid/login/validate",
+            data={
+                "growId": username,
+                "password": password,
+                "_token": token
+            },
+            timeout=TIMEOUT
+        )
+    except requests.RequestException as e:
+        log.warning("Request failed: %s", e)
+        return
 
     if response.status_code != 200:
-        print(f"Login request failed, status code: {response.status_code}")
+        log.warning("Login request failed, status code: %d", response.status_code)
         return
     
     try:
         data = response.json()
     except ValueError:
-        soup = BeautifulSoup(response.text, "html.parser")
-        error_div = soup.find("div", class_="text-danger-wrapper")
+        error_text = find_class_text(response.text, "div", "text-danger-wrapper")
 
-        if error_div:
-            print(error_div.get_text(strip=True))
+        if error_text is not None:
+            log.warning("Login rejected: %s", error_text)
 
         return
 
     if data.get("status") == "success":
-        print("Login successful.")
+        log.info("Login successful.")
         return data.get("token")
 
 def fetch_login_urls(login_data):
@@ -55,30 +73,25 @@ def fetch_login_urls(login_data):
         "Content-Type": "application/x-www-form-urlencoded"
     }
 
-    print("Fetching login URLs...")
-    try:
-        response = requests.post(url, headers=headers, data=quote(login_data.strip()))
-        
+    session = new_session()
+
+    # None once every attempt failed, the bot then backs off and resolves again later
+    for attempt in range(FETCH_ATTEMPTS):
+        if attempt:
+            time.sleep(RETRY_DELAY)
+        log.info("Fetching login URLs...")
+        try:
+            response = session.post(url, headers=headers, data=quote(login_data.strip()), timeout=TIMEOUT)
+        except requests.RequestException as e:
+            log.warning("Request failed: %s", e)
+            continue
+
         if response.status_code != 200:
-            print(f"Failed to fetch login URLs, status code: {response.status_code}")
-            time.sleep(5)
-            return fetch_login_urls(login_data)
-
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        apple_link = soup.find('a', onclick="optionChose('Apple');")
-        apple_href = apple_link['href'] if apple_link else None
-        google_link = soup.find('a', onclick="optionChose('Google');")
-        google_href = google_link['href'] if google_link else None
-        growtopia_link = soup.find('a', onclick="optionChose('Grow');")
-        growtopia_href = growtopia_link['href'] if growtopia_link else None
-
-        return {
-            "apple": apple_href,
-            "google": google_href,
-            "growtopia": growtopia_href
-        }
-    except requests.RequestException as e:
-        print(f"Request failed: {e}")
-        time.sleep(5)
-        return fetch_login_urls(login_data)
\ No newline at end of file
+            log.warning("Failed to fetch login URLs, status code: %d", response.status_code)
+            continue
+
+        links = find_onclick_links(response.text, LOGIN_OPTIONS.values())
+        return {name: links[onclick] for name, onclick in LOGIN_OPTIONS.items()}
+
+    log.warning("No login URLs after %d attempts.", FETCH_ATTEMPTS)
+    return None
\ No newline at end of file
@@ -0,0 +1,121 @@
+import time
+from collections import deque
+from core.ffi import ENET_PEER_PACKET_LOSS_SCALE, ENetPeer
+
+PING_SAMPLES = 64
+
+# Below the first bound a signal costs no health, at the second it costs all of it
+REPLY_DELAY_BOUNDS = (0.05, 1.0)
+RTT_BOUNDS = (0.15, 1.5)
+PACKET_LOSS_BOUNDS = (0.02, 0.5)
+# A ping this many typical intervals late means the connection or the loop is stuck
+STALE_INTERVALS = 3
+
+class RollingStats:
+    __slots__ = ("samples",)
+
+    def __init__(self, size=PING_SAMPLES):
+        self.samples = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def add(self, value: float) -> None:
+        self.samples.append(value)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def snapshot(self) -> dict:
+        if not self.samples:
+            return {"count": 0}
+        return {
+            "count": len(self.samples),
+            "last": self.samples[-1],
+            "mean": sum(self.samples) / len(self.samples),
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "max": max(self.samples),
+        }
+
+def penalty(value: float, bounds) -> float:
+    low, high = bounds
+    if value <= low:
+        return 0.0
+    if value >= high:
+        return 1.0
+    return (value - low) / (high - low)
+
+class PingTracker:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.intervals = RollingStats()
+        self.reply_delays = RollingStats()
+        self.rtts = RollingStats()
+        self.packet_loss = 0.0
+        self.requests = 0
+        self.replies = 0
+        self.last_request = None
+        # Receive times of pings whose reply has not left the send queue yet
+        self.pending = deque()
+
+    def reset(self) -> None:
+        self.last_request = None
+        self.pending.clear()
+
+    def request_received(self, peer=None) -> None:
+        now = self.clock()
+        if self.last_request is not None:
+            self.intervals.add(now - self.last_request)
+        self.last_request = now
+        self.pending.append(now)
+        self.requests += 1
+
+        if peer:
+            stats = ENetPeer.from_address(peer)
+            self.rtts.add(stats.roundTripTime / 1000)
+            self.packet_loss = stats.packetLoss / ENET_PEER_PACKET_LOSS_SCALE
+
+    def reply_sent(self, now: float) -> None:
+        if self.pending:
+            self.reply_delays.add(now - self.pending.popleft())
+        self.replies += 1
+
+    def reply_dropped(self) -> None:
+        # The reply never left, so its ping must not be matched against the next reply sent
+        if self.pending:
+            self.pending.popleft()
+
+    def health(self) -> float:
+        # 1.0 is a healthy connection, 0.0 one that should not be given work
+        if self.last_request is None:
+            return 1.0
+
+        score = 1.0
+        if self.reply_delays:
+            score *= 1.0 - penalty(self.reply_delays.percentile(0.95), REPLY_DELAY_BOUNDS)
+        if self.rtts:
+            score *= 1.0 - penalty(self.rtts.percentile(0.50), RTT_BOUNDS)
+        score *= 1.0 - penalty(self.packet_loss, PACKET_LOSS_BOUNDS)
+
+        if len(self.intervals) >= 2:
+            typical = self.intervals.percentile(0.50)
+            silence = self.clock() - self.last_request
+            if typical > 0 and silence > typical * STALE_INTERVALS:
+                score *= 1.0 - penalty(silence / typical, (STALE_INTERVALS, STALE_INTERVALS * 3))
+
+        return score
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "replies": self.replies,
+            "interval": self.intervals.snapshot(),
+            "reply_delay": self.reply_delays.snapshot(),
+            "rtt": self.rtts.snapshot(),
+            "packet_loss": self.packet_loss,
+            "health": self.health(),
+        }
\ No newline at end of file
@@ -0,0 +1,133 @@
+import struct
+import time
+from collections import deque
+from core.ffi import enet_packet_create, enet_packet_destroy, enet_packet_view, enet_peer_send
+from core.entities.enums import NetGamePacket
+from core.utils import BYTES, OUTBOUND, PACKETS, Metrics, TankPacket, get_logger, type_name
+
+log = get_logger("send")
+
+PING_REPLY = NetGamePacket.PingReply.value
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+class SendQueue:
+    def __init__(self, max_depth=1024, rate_limits=None, clock=time.monotonic, capture=None, metrics=None, ping=None):
+        self.max_depth = max_depth
+        self.clock = clock
+        self.capture = capture
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.ping = ping
+        self.pending = deque()
+        self.buckets = {}
+        self.sent = 0
+        self.dropped = {}
+
+        now = clock()
+        # rate_limits maps a NetMessage to (packets per second, burst size)
+        for packet_type, (rate, burst) in (rate_limits or {}).items():
+            self.buckets[packet_type] = TokenBucket(rate, burst, now)
+
+    def __len__(self):
+        return len(self.pending)
+
+    def push(self, packet_type, payload: bytes | TankPacket) -> bool:
+        if len(self.pending) >= self.max_depth:
+            self.drop(packet_type, payload)
+            return False
+        self.pending.append((packet_type, payload))
+        return True
+
+    def drop(self, packet_type, payload) -> None:
+        self.dropped[packet_type] = self.dropped.get(packet_type, 0) + 1
+        if isinstance(payload, TankPacket) and payload.type == PING_REPLY and self.ping is not None:
+            self.ping.reply_dropped()
+
+    def clear(self) -> None:
+        self.pending.clear()
+
+    def flush(self, peer) -> int:
+        if not self.pending:
+            return 0
+
+        now = self.clock()
+        throttled = set()
+        held = deque()
+        sent = 0
+
+        while self.pending:
+            packet_type, payload = self.pending.popleft()
+
+            # Once a type runs out of tokens everything behind it of the same type waits too, to keep per-type order.
+            # Ping replies are GamePackets like every action but are never held, a late one gets the bot timed out
+            is_tank_packet = isinstance(payload, TankPacket)
+            bucket = self.buckets.get(packet_type)
+            exempt = is_tank_packet and payload.type == PING_REPLY
+            if not exempt and (packet_type in throttled or (bucket is not None and not bucket.take(now))):
+                throttled.add(packet_type)
+                held.append((packet_type, payload))
+                continue
+
+            # Tank packets are encoded straight into the ENet buffer
+            size = payload.encoded_size() if is_tank_packet else len(payload)
+            packet = enet_packet_create(None, 4 + size, 1)
+            buffer = enet_packet_view(packet.contents)
+            try:
+                struct.pack_into("<I", buffer, 0, packet_type.value)
+                if is_tank_packet:
+                    payload.encode_into(buffer, 4)
+                else:
+                    buffer[4:] = payload
+            except Exception:
+                # flush runs in the loop every bot shares, a bad packet is dropped rather than stopping all of them
+                log.exception("Failed to encode packet of type: %s", packet_type.name)
+                buffer.release()
+                enet_packet_destroy(packet)
+                self.drop(packet_type, payload)
+                continue
+            if self.capture is not None:
+                self.capture.write(OUTBOUND, buffer)
+            buffer.release()
+
+            if enet_peer_send(peer, 0, packet) < 0:
+                log.warning("Failed to send packet of type: %s", packet_type.name)
+                enet_packet_destroy(packet)
+                self.drop(packet_type, payload)
+                continue
+
+            sent += 1
+            labels = ("out", "net", packet_type.name)
+            self.metrics.inc(PACKETS, labels)
+            self.metrics.inc(BYTES, labels, size)
+            if is_tank_packet:
+                labels = ("out", "packet", type_name(NetGamePacket, payload.type))
+                self.metrics.inc(PACKETS, labels)
+                self.metrics.inc(BYTES, labels, size)
+                if payload.type == PING_REPLY and self.ping is not None:
+                    self.ping.reply_sent(now)
+
+        self.pending = held
+        self.sent += sent
+        return sent
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self.pending),
+            "sent": self.sent,
+            "dropped": {packet_type.name: count for packet_type, count in self.dropped.items()},
+        }
\ No newline at end of file
@@ -1,11 +1,59 @@
 import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from core.utils import get_logger
+from .http import TIMEOUT, session
 
-def fetch_server_data(protocol, version, alternate=False):
-    domain = "growtopia2" if alternate else "growtopia1"
+MIRRORS = ("growtopia1", "growtopia2")
+SERVER_DATA_TTL = 60
+RETRY_DELAY = 1
+FETCH_ATTEMPTS = 3
+
+log = get_logger("http")
+
+cache = {}
+fetch_lock = threading.Lock()
+executor = ThreadPoolExecutor(max_workers=len(MIRRORS) * 2, thread_name_prefix="server-data")
+
+def fetch_server_data(protocol, version):
+    # None once every attempt failed, the bot then backs off and resolves again later
+    key = (protocol, version)
+    for attempt in range(FETCH_ATTEMPTS):
+        if attempt:
+            # Outside the lock, so a retrying thread never holds up the others
+            time.sleep(RETRY_DELAY)
+        result = fetch_once(key, protocol, version)
+        if result is not None:
+            return dict(result)
+
+    log.warning("No mirror returned server data after %d attempts.", FETCH_ATTEMPTS)
+    return None
+
+def fetch_once(key, protocol, version):
+    # Only one thread hits the mirrors at a time, everyone else picks up its cached result.
+    # Failures are cached for RETRY_DELAY, so threads queued behind one fail at once instead of each waiting out the mirrors
+    with fetch_lock:
+        cached = cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        result = fetch_from_mirrors(protocol, version)
+        cache[key] = (time.monotonic() + (SERVER_DATA_TTL if result is not None else RETRY_DELAY), result)
+        return result
+
+def fetch_from_mirrors(protocol, version):
+    futures = [executor.submit(fetch_from_mirror, domain, protocol, version) for domain in MIRRORS]
+    for future in as_completed(futures):
+        result = future.result()
+        if result is not None:
+            return result
+    return None
+
+def fetch_from_mirror(domain, protocol, version):
     url = f"https://www.{domain}.com/growtopia/server_data.php"
 
-    print(f"Fetching server data from {domain}.com")
+    log.info("Fetching server data from %s.com", domain)
 
     headers = {
         "User-Agent": "UbiServices_SDK_2022.Release.9_PC64_ansi_static",
@@ -13,21 +61,19 @@ def fetch_server_data(protocol, version, alternate=False):
     }
     data = f"platform=0&protocol={protocol}&version={version}"
     try:
-        response = requests.post(url, headers=headers, data=data)
-        
+        response = session.post(url, headers=headers, data=data, timeout=TIMEOUT)
+
         if response.status_code != 200:
-            print(f"Failed to fetch server data from {domain}.com, status code: {response.status_code}")
-            time.sleep(1)
-            return fetch_server_data(protocol, version, not alternate)
-        
+            log.warning("Failed to fetch server data from %s.com, status code: %d", domain, response.status_code)
+            return None
+
         data_text = response.text
-        print(f"Server data fetched successfully from {domain}.com")
+        log.info("Server data fetched successfully from %s.com", domain)
         return parse_server_data(data_text)
-        
+
     except requests.RequestException as e:
-        print(f"Request failed: {e}")
-        time.sleep(1)
-        return fetch_server_data(protocol, version, not alternate)
+        log.warning("Request failed: %s", e)
+        return None
 
 def parse_server_data(data):
     lines = data.split('\n')
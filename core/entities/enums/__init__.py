@@ -1,3 +1,4 @@
+from .connection_state import ConnectionState
 from .hash_mode import HashMode
 from .item_flag import ItemFlag
 from .login_method import LoginMethod
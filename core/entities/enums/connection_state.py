@@ -0,0 +1,10 @@
+from enum import Enum
+
+class ConnectionState(Enum):
+    Disconnected = 0
+    Resolving = 1
+    Connecting = 2
+    LoggingIn = 3
+    InGame = 4
+    Redirecting = 5
+    Backoff = 6
\ No newline at end of file
@@ -16,27 +16,6 @@ except OSError:
     print(f"Failed to load {lib_name}. Ensure it is compiled and located in the 'enet' directory.")
     exit(1)
 
-class TankPacket(ctypes.Structure):
-    _fields_ = [
-        ("type", ctypes.c_uint8),
-        ("object_type", ctypes.c_uint8),
-        ("jump_count", ctypes.c_uint8),
-        ("animation_type", ctypes.c_uint8),
-        ("net_id", ctypes.c_uint32),
-        ("target_net_id", ctypes.c_int32),
-        ("flags", ctypes.c_uint32),
-        ("float_variable", ctypes.c_float),
-        ("value", ctypes.c_uint32),
-        ("vector_x", ctypes.c_float),
-        ("vector_y", ctypes.c_float),
-        ("vector_x2", ctypes.c_float),
-        ("vector_y2", ctypes.c_float),
-        ("particle_rotation", ctypes.c_float),
-        ("int_x", ctypes.c_int32),
-        ("int_y", ctypes.c_int32),
-        ("extended_data_length", ctypes.c_uint32)
-    ]
-
 class ENetAddress(ctypes.Structure):
     _fields_ = [
         ("host", ctypes.c_uint8 * 16),
@@ -44,6 +23,61 @@ class ENetAddress(ctypes.Structure):
         ("sin6_scope_id", ctypes.c_uint16)
     ]
 
+# Leading fields of ENetPeer, up to the statistics read from Python, the rest of the struct is never touched
+class ENetPeer(ctypes.Structure):
+    _fields_ = [
+        ("dispatchList", ctypes.c_void_p * 2),
+        ("host", ctypes.c_void_p),
+        ("outgoingPeerID", ctypes.c_uint16),
+        ("incomingPeerID", ctypes.c_uint16),
+        ("connectID", ctypes.c_uint32),
+        ("outgoingSessionID", ctypes.c_uint8),
+        ("incomingSessionID", ctypes.c_uint8),
+        ("address", ctypes.c_uint32 * 5),          # ENetAddress, as words so it gets the 4 byte alignment of in6_addr
+        ("data", ctypes.c_void_p),
+        ("state", ctypes.c_int),
+        ("channels", ctypes.c_void_p),
+        ("channelCount", ctypes.c_size_t),
+        ("incomingBandwidth", ctypes.c_uint32),
+        ("outgoingBandwidth", ctypes.c_uint32),
+        ("incomingBandwidthThrottleEpoch", ctypes.c_uint32),
+        ("outgoingBandwidthThrottleEpoch", ctypes.c_uint32),
+        ("incomingDataTotal", ctypes.c_uint32),
+        ("totalDataReceived", ctypes.c_uint64),
+        ("outgoingDataTotal", ctypes.c_uint32),
+        ("totalDataSent", ctypes.c_uint64),
+        ("lastSendTime", ctypes.c_uint32),
+        ("lastReceiveTime", ctypes.c_uint32),
+        ("nextTimeout", ctypes.c_uint32),
+        ("earliestTimeout", ctypes.c_uint32),
+        ("packetLossEpoch", ctypes.c_uint32),
+        ("packetsSent", ctypes.c_uint32),
+        ("totalPacketsSent", ctypes.c_uint64),
+        ("packetsLost", ctypes.c_uint32),
+        ("totalPacketsLost", ctypes.c_uint32),
+        ("packetLoss", ctypes.c_uint32),            # ratio scaled by ENET_PEER_PACKET_LOSS_SCALE
+        ("packetLossVariance", ctypes.c_uint32),
+        ("packetThrottle", ctypes.c_uint32),
+        ("packetThrottleLimit", ctypes.c_uint32),
+        ("packetThrottleCounter", ctypes.c_uint32),
+        ("packetThrottleEpoch", ctypes.c_uint32),
+        ("packetThrottleAcceleration", ctypes.c_uint32),
+        ("packetThrottleDeceleration", ctypes.c_uint32),
+        ("packetThrottleInterval", ctypes.c_uint32),
+        ("pingInterval", ctypes.c_uint32),
+        ("timeoutLimit", ctypes.c_uint32),
+        ("timeoutMinimum", ctypes.c_uint32),
+        ("timeoutMaximum", ctypes.c_uint32),
+        ("lastRoundTripTime", ctypes.c_uint32),
+        ("lowestRoundTripTime", ctypes.c_uint32),
+        ("lastRoundTripTimeVariance", ctypes.c_uint32),
+        ("highestRoundTripTimeVariance", ctypes.c_uint32),
+        ("roundTripTime", ctypes.c_uint32),         # mean RTT in milliseconds
+        ("roundTripTimeVariance", ctypes.c_uint32),
+    ]
+
+ENET_PEER_PACKET_LOSS_SCALE = 1 << 16
+
 class ENetEventType(IntEnum):
     NONE = 0
     CONNECT = 1
@@ -102,6 +136,10 @@ enet_host_compress_with_range_coder = enet.enet_host_compress_with_range_coder
 enet_host_compress_with_range_coder.argtypes = [ctypes.c_void_p]
 enet_host_compress_with_range_coder.restype = ctypes.c_int
 
+enet_host_flush = enet.enet_host_flush
+enet_host_flush.argtypes = [ctypes.c_void_p]
+enet_host_flush.restype = None
+
 enet_host_destroy = enet.enet_host_destroy
 enet_host_destroy.argtypes = [ctypes.c_void_p]
 enet_host_destroy.restype = ctypes.c_int
@@ -120,4 +158,27 @@ enet_packet_create.restype = ctypes.POINTER(ENetPacket)
 
 enet_peer_disconnect = enet.enet_peer_disconnect
 enet_peer_disconnect.argtypes = [ctypes.c_void_p, ctypes.c_uint32]
-enet_peer_disconnect.restype = None
\ No newline at end of file
+enet_peer_disconnect.restype = None
+
+enet_peer_disconnect_now = enet.enet_peer_disconnect_now
+enet_peer_disconnect_now.argtypes = [ctypes.c_void_p, ctypes.c_uint32]
+enet_peer_disconnect_now.restype = None
+
+# Added next to ENet in enet.cpp, None when the library was built before it existed and core.utils.hash falls back to Python
+gt_hash_update = getattr(enet, "gt_hash_update", None)
+if gt_hash_update is not None:
+    gt_hash_update.argtypes = [ctypes.c_uint32, ctypes.c_char_p, ctypes.c_size_t]
+    gt_hash_update.restype = ctypes.c_uint32
+
+# Borrowed view over the packet buffer, it must not be used after the packet is destroyed
+def enet_packet_view(packet) -> memoryview:
+    if packet.dataLength == 0:
+        return memoryview(b"")
+    buffer = (ctypes.c_uint8 * packet.dataLength).from_address(ctypes.addressof(packet.data.contents))
+    return memoryview(buffer).cast("B")
+
+# ENetSocket is the first member of ENetHost
+ENetSocket = ctypes.c_size_t if system == "Windows" else ctypes.c_int
+
+def enet_host_socket(host) -> int:
+    return ENetSocket.from_address(host).value
\ No newline at end of file
@@ -1 +1,5 @@
-from .net_message_handler import NetMessageHandler
\ No newline at end of file
+from .registry import Registry
+from .net_message_handler import NetMessageHandler
+from .game_packet_handler import GamePacketHandler
+from .variant_handler import VariantHandler
+from .profiler import HandlerProfiler
\ No newline at end of file
@@ -1,67 +1,71 @@
-import ctypes
-import zlib
+import asyncio
+import os
+from .items_loader import install_items, shared
+from .registry import Registry
 from .variant_handler import VariantHandler
-from core.entities.enums import NetGamePacket, NetMessage
-from core.manager import load_from_file
-from core.ffi import TankPacket
+from core.entities.enums import NetGamePacket
+from core.manager import ingest_items
+from core.utils import TankPacket, get_logger
+
+log = get_logger("packet")
+handlers = Registry("packet", NetGamePacket)
 
 class GamePacketHandler:
-    @staticmethod
-    def handle(client, packet):
-        tank_data_ptr = ctypes.cast(packet, ctypes.POINTER(TankPacket))
-        tank_data = tank_data_ptr.contents
-        tank_type = NetGamePacket(tank_data.type)
-        extended_data = ctypes.string_at(packet + ctypes.sizeof(TankPacket), tank_data.extended_data_length)
+    registry = handlers
 
-        match tank_type:
-            case NetGamePacket.CallFunction:
-                onCallFunction(client, extended_data)
-            case NetGamePacket.SendMapData:
-                onSendMapData(client, extended_data)
-            case NetGamePacket.SendInventoryState:
-                onSendInventoryState(client, extended_data)
-            case NetGamePacket.SendItemDatabaseData:
-                onSendItemDatabaseData(client, extended_data)
-            case NetGamePacket.PingRequest:
-                onPingRequest(client, tank_data)
+    @staticmethod
+    async def handle(client, data):
+        tank_data = TankPacket.decode(data)
+        await handlers.dispatch(tank_data.type, client, tank_data, len(data))
 
-def onCallFunction(client, data):
-    VariantHandler.handle(client, data)
+@handlers.on(NetGamePacket.CallFunction)
+async def onCallFunction(client, tank_data):
+    await VariantHandler.handle(client, tank_data.extended_data)
 
-def onSendMapData(client, data):
-    with open("cache/world.dat", "wb") as f:
+@handlers.on(NetGamePacket.SendMapData)
+async def onSendMapData(client, tank_data):
+    data = tank_data.extended_data
+    with open(os.path.join(client.cache_dir, "world.dat"), "wb") as f:
         f.write(data)
 
     try:
         client.world.parse(data, client.items_database)
     except Exception as e:
-        print(f"Failed to parse world: {e}")
+        log.error("Failed to parse world: %s", e)
         raise
 
-def onSendInventoryState(client, data):
-    client.inventory.parse(data)
+@handlers.on(NetGamePacket.SendInventoryState)
+async def onSendInventoryState(client, tank_data):
+    client.inventory.parse(tank_data.extended_data)
 
-def onSendItemDatabaseData(client, data):
-    decoder = zlib.decompress(data)
-    with open("cache/items.dat", "wb") as f:
-        f.write(decoder)
+@handlers.on(NetGamePacket.SendItemDatabaseData)
+async def onSendItemDatabaseData(client, tank_data):
+    # The payload is a view into the ENet packet, which is destroyed as soon as this handler returns
+    data = bytes(tank_data.extended_data)
+    items_path = os.path.join(client.cache_dir, "items.dat")
+    live = client.items_database
+    client.items_ingest = asyncio.create_task(install_items(client, shared(items_path, lambda: update_items(data, items_path, live))))
 
-    client.send_packet(NetMessage.GenericText, "action|enter_game\n")
-    client.redirected = False
+async def update_items(data, items_path, live):
+    items_database, changes = await asyncio.to_thread(ingest_items, data, items_path, live)
+    if changes is None:
+        return items_database
 
-    try:
-        client.items_database = load_from_file("cache/items.dat")
-    except Exception as e:
-        print(f"Failed to load items.dat: {e}")
-        raise
+    # Applied here on the event loop, so no handler sees a half patched database
+    live.apply_changes(changes)
+    log.info("Patched the item database: %d added, %d removed, %d modified.", len(changes.added), len(changes.removed), len(changes.modified))
+    return live
 
-def onPingRequest(client, data):
-    print("Received PingRequest, sending PingReply.")
-    tank_packet = TankPacket()
-    tank_packet.type = NetGamePacket.PingReply.value
-    tank_packet.vector_x = 64.0
-    tank_packet.vector_y = 64.0
-    tank_packet.vector_x2 = 1000.0
-    tank_packet.vector_y2 = 250.0
-    tank_packet.value = data.value + 5000
+@handlers.on(NetGamePacket.PingRequest)
+async def onPingRequest(client, tank_data):
+    log.debug("Received PingRequest, sending PingReply.")
+    client.ping.request_received(client.peer)
+    tank_packet = TankPacket(
+        type=NetGamePacket.PingReply.value,
+        vector_x=64.0,
+        vector_y=64.0,
+        vector_x2=1000.0,
+        vector_y2=250.0,
+        value=(tank_data.value + 5000) & 0xFFFFFFFF,
+    )
     client.send_packet_raw(tank_packet)
\ No newline at end of file
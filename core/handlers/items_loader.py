@@ -0,0 +1,32 @@
+import asyncio
+from core.entities.enums import ConnectionState
+from core.utils import get_logger
+
+log = get_logger("packet")
+
+# items.dat path -> the running load or ingest of it
+tasks = {}
+
+def shared(items_path, start):
+    # Bots of a fleet share the file and the database, so concurrent loads of it share one task
+    task = tasks.get(items_path)
+    if task is None:
+        task = tasks[items_path] = asyncio.ensure_future(start())
+        task.add_done_callback(lambda _: tasks.pop(items_path, None))
+    return task
+
+async def install_items(client, task):
+    peer = client.peer
+    try:
+        items_database = await asyncio.shield(task)
+    except Exception as e:
+        log.error("Failed to load items.dat: %s", e)
+        # Only the session that asked for it, the peer slot may hold a newer one by now
+        if client.peer == peer and client.state is ConnectionState.LoggingIn:
+            client.disconnect()
+        return
+
+    client.items_database = items_database
+    # Entering only once the database is in place, the world data that follows needs it
+    if client.peer == peer and client.state is ConnectionState.LoggingIn:
+        client.enter_game()
\ No newline at end of file
@@ -1,29 +1,24 @@
-import ctypes
 from .game_packet_handler import GamePacketHandler
+from .registry import Registry
 from core.entities.enums import NetMessage
-from core.utils import read_u32
-from core.ffi import enet_peer_disconnect
+from core.utils import get_logger, read_u32
+
+log = get_logger("net")
+handlers = Registry("net", NetMessage)
 
 class NetMessageHandler:
+    registry = handlers
+
     @staticmethod
-    def handle(client, packet):
-        if packet.dataLength < 4:
-            print("Received packet is too short to read message type.")
+    async def handle(client, data):
+        if len(data) < 4:
+            log.warning("Received packet is too short to read message type.")
             return
 
-        message_type = NetMessage(read_u32(packet.data))
-
-        data_start = ctypes.addressof(packet.data.contents) + 4
-        match message_type:
-            case NetMessage.ServerHello:
-                onServerHello(client)
-            case NetMessage.GameMessage:
-                onGameMessage(client, data_start, packet)
-            case NetMessage.GamePacket:
-                onGamePacket(client, data_start)
+        await handlers.dispatch(read_u32(data), client, data[4:], len(data) - 4)
 
-def onServerHello(client):
-    data = None
+@handlers.on(NetMessage.ServerHello)
+async def onServerHello(client, data):
     if client.redirected:
         data = (
             "UUIDToken|{}\nprotocol|{}\nfhash|{}\nmac|{}\nrequestedName|{}\n"
@@ -67,15 +62,17 @@ def onServerHello(client):
 
     client.send_packet(NetMessage.GenericText, data)
 
-def onGameMessage(client, data, packet):
+@handlers.on(NetMessage.GameMessage)
+async def onGameMessage(client, data):
     try:
-        text_data = ctypes.string_at(data, packet.dataLength - 4).decode("utf-8").strip()
-        print(f"GameMessage received: {text_data}")
+        text_data = str(data, "utf-8").strip()
+        log.info("GameMessage received: %s", text_data)
 
         if "action|logon_fail" in text_data:
-            enet_peer_disconnect(client.peer, 0)
+            client.disconnect()
     except UnicodeDecodeError:
-        print("Failed to decode GameMessage as UTF-8.")
+        log.warning("Failed to decode GameMessage as UTF-8.")
 
-def onGamePacket(client, packet):
-    GamePacketHandler.handle(client, packet)
\ No newline at end of file
+@handlers.on(NetMessage.GamePacket)
+async def onGamePacket(client, packet):
+    await GamePacketHandler.handle(client, packet)
\ No newline at end of file
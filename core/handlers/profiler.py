@@ -0,0 +1,114 @@
+import asyncio
+import cProfile
+import functools
+import io
+import os
+import pstats
+import signal
+import time
+from .game_packet_handler import GamePacketHandler
+from .net_message_handler import NetMessageHandler
+from .variant_handler import VariantHandler
+from core.utils import get_logger
+
+log = get_logger("profiler")
+
+class HandlerProfiler:
+    def __init__(self, mode="wall", registries=None):
+        if mode not in ("wall", "cprofile"):
+            raise ValueError(f"Unknown profiling mode {mode!r}, expected 'wall' or 'cprofile'.")
+
+        self.mode = mode
+        self.registries = registries or (NetMessageHandler.registry, GamePacketHandler.registry, VariantHandler.registry)
+        # "kind:name" -> [calls, total seconds, max seconds], inclusive of nested handlers
+        self.timings = {}
+        self.profile = cProfile.Profile() if mode == "cprofile" else None
+        self.depth = 0
+        self.enabled = False
+
+    def enable(self) -> "HandlerProfiler":
+        if not self.enabled:
+            for registry in self.registries:
+                registry.wrap(functools.partial(self.wrap, registry.kind))
+            self.enabled = True
+        return self
+
+    def disable(self) -> None:
+        if self.enabled:
+            for registry in self.registries:
+                registry.wrap(None)
+            self.enabled = False
+
+    def wrap(self, kind, name, handler):
+        timing = self.timings.setdefault(f"{kind}:{name}", [0, 0.0, 0.0])
+        profile = self.profile
+
+        @functools.wraps(handler)
+        async def profiled(client, data):
+            # Only the outermost handler toggles cProfile, nested handlers show up inside its call tree
+            outermost = self.depth == 0
+            self.depth += 1
+            if outermost and profile is not None:
+                profile.enable()
+            start = time.perf_counter()
+            try:
+                return await handler(client, data)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.depth -= 1
+                if outermost and profile is not None:
+                    profile.disable()
+                timing[0] += 1
+                timing[1] += elapsed
+                if elapsed > timing[2]:
+                    timing[2] = elapsed
+
+        return profiled
+
+    def report(self, limit=40) -> str:
+        lines = [f"{'handler':<64} {'calls':>8} {'total ms':>10} {'mean us':>10} {'max ms':>9}"]
+        for label, (calls, total, peak) in sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True):
+            if calls == 0:
+                continue
+            lines.append(f"{label:<64} {calls:>8} {total * 1000:>10.2f} {total / calls * 1e6:>10.1f} {peak * 1000:>9.2f}")
+
+        if self.profile is not None:
+            stream = io.StringIO()
+            pstats.Stats(self.profile, stream=stream).sort_stats("cumulative").print_stats(limit)
+            lines.append("")
+            lines.append(stream.getvalue())
+
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path) -> None:
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.report())
+        os.replace(temp_path, path)
+
+        if self.profile is not None:
+            self.profile.dump_stats(f"{path}.prof")
+
+        log.info("Wrote handler profile to %s", path)
+
+    def reset(self) -> None:
+        for timing in self.timings.values():
+            timing[:] = [0, 0.0, 0.0]
+        if self.profile is not None:
+            self.profile = cProfile.Profile()
+            if self.enabled:
+                self.disable()
+                self.enable()
+
+    def dump_on_signal(self, path, signum=None) -> bool:
+        signum = signum if signum is not None else getattr(signal, "SIGUSR1", None)
+        if signum is None:
+            log.warning("This platform has no SIGUSR1, call dump() instead.")
+            return False
+
+        # Inside an event loop the dump runs between handlers, never halfway through one
+        try:
+            asyncio.get_running_loop().add_signal_handler(signum, self.dump, path)
+        except RuntimeError:
+            signal.signal(signum, lambda *_: self.dump(path))
+        return True
@@ -0,0 +1,61 @@
+import time
+from collections import Counter
+from enum import Enum
+from core.utils import BYTES, HANDLER_SECONDS, PACKETS, type_name
+
+class Registry:
+    def __init__(self, kind, keys=None):
+        # kind labels this layer in metrics, keys is the enum used to name int types, lookups only use the raw int or str
+        self.kind = kind
+        self.keys = keys
+        self.registered = {}
+        self.handlers = {}
+        self.wrapper = None
+        self.unhandled = Counter()
+
+    def on(self, key):
+        def decorator(handler):
+            self.register(key, handler)
+            return handler
+        return decorator
+
+    def register(self, key, handler) -> None:
+        key = key.value if isinstance(key, Enum) else key
+        self.registered[key] = handler
+        self.handlers[key] = handler if self.wrapper is None else self.wrapper(self.name(key), handler)
+
+    def unregister(self, key) -> None:
+        key = key.value if isinstance(key, Enum) else key
+        self.registered.pop(key, None)
+        self.handlers.pop(key, None)
+
+    def wrap(self, wrapper) -> None:
+        # wrapper(name, handler) returns the handler to dispatch to, None puts the registered handlers back
+        self.wrapper = wrapper
+        if wrapper is None:
+            self.handlers = dict(self.registered)
+        else:
+            self.handlers = {key: wrapper(self.name(key), handler) for key, handler in self.registered.items()}
+
+    async def dispatch(self, key, client, data, size=0):
+        labels = (self.kind, self.name(key))
+        metrics = client.metrics
+        metrics.inc(PACKETS, ("in",) + labels)
+        metrics.inc(BYTES, ("in",) + labels, size)
+
+        handler = self.handlers.get(key)
+        if handler is None:
+            self.unhandled[key] += 1
+            return None
+
+        start = time.perf_counter()
+        try:
+            return await handler(client, data)
+        finally:
+            metrics.observe(HANDLER_SECONDS, labels, time.perf_counter() - start)
+
+    def name(self, key) -> str:
+        return type_name(self.keys, key) if isinstance(key, int) else key
+
+    def stats(self) -> dict:
+        return {self.name(key): count for key, count in self.unhandled.items()}
@@ -1,77 +1,74 @@
-from core.entities.enums import NetMessage, HashMode
-from core.manager import load_from_file
-from core.utils import VariantList, hash
-from core.ffi import enet_peer_disconnect
+import asyncio
+import os
+from .items_loader import install_items, shared
+from .registry import Registry
+from core.entities.enums import NetMessage
+from core.manager import load_columns
+from core.utils import VariantList, file_hash, get_logger
+
+log = get_logger("variant")
+handlers = Registry("variant")
+
+QUIET_FUNCTIONS = frozenset({
+    "OnClearItemTransforms",
+    "OnSetItemTransform",
+    "OnItemVariablesHasChanged",
+})
 
 class VariantHandler:
+    registry = handlers
+
     @staticmethod
-    def handle(client, data):
+    async def handle(client, data):
         variant_list = VariantList.deserialize(data)
         function_name = variant_list.variants[0].as_string()
 
-        skip = {
-            "OnClearItemTransforms",
-            "OnSetItemTransform",
-            "OnItemVariablesHasChanged",
-        }
-
-        if function_name not in skip:
-            print(f"Handling variant function: {function_name}")
+        if function_name not in QUIET_FUNCTIONS:
+            log.debug("Handling variant function: %s", function_name)
 
-        match function_name:
-            case "OnSendToServer":
-                onSendToServer(client, variant_list)
-            case "OnSuperMainStartAcceptLogonHrdxs47254722215a":
-                onSuperMainStartAcceptLogonHrdxs47254722215a(client, variant_list)
-            case "OnConsoleMessage":
-                onConsoleMessage(variant_list)
+        await handlers.dispatch(function_name, client, variant_list, len(data))
 
-def onSendToServer(client, var):
+@handlers.on("OnSendToServer")
+async def onSendToServer(client, var):
     port = var.get(1).as_int32()
     token = var.get(2).as_string()
     user_id = var.get(3).as_string()
     server_data = var.get(4).as_string().split('|')
     aat = var.get(5).as_string()
 
-    client.redirected = True
-    client.address = server_data[0]
-    client.port = port
     client.login_info.token = token
     client.login_info.user = user_id
     client.login_info.door_id = server_data[1]
     client.login_info.uuid = server_data[2]
     client.login_info.aat = aat
 
-    print(f"Redirecting to server {client.address}:{client.port} with token {token} and user ID {user_id}.")
-    enet_peer_disconnect(client.peer, 0)
+    log.info("Redirecting to server %s:%d with token %s and user ID %s.", server_data[0], port, token, user_id)
+    client.redirect(server_data[0], port)
 
-def onSuperMainStartAcceptLogonHrdxs47254722215a(client, var):
+@handlers.on("OnSuperMainStartAcceptLogonHrdxs47254722215a")
+async def onSuperMainStartAcceptLogonHrdxs47254722215a(client, var):
     server_hash = var.get(1).as_uint32()
+    items_path = os.path.join(client.cache_dir, "items.dat")
 
     try:
-        with open("cache/items.dat", "rb") as f:
-            data = f.read()
-
-        print("items.dat size:", len(data))
-        hash_value = hash(data, HashMode.FixedLength, len(data)) & 0xFFFFFFFF
+        hash_value = file_hash(items_path)
+        log.debug("items.dat hash: %d, server hash: %d", hash_value, server_hash)
 
         if hash_value == server_hash:
-            client.send_packet(NetMessage.GenericText, "action|enter_game\n")
-            client.redirected = False
-
-            try:
-                client.items_database = load_from_file("cache/items.dat")
-            except Exception as e:
-                print(f"Failed to load items.dat: {e}")
-                raise
-
+            # Every redirect logs on again, the database loaded or patched for this hash is still current
+            if getattr(client.items_database, "items_hash", None) == server_hash:
+                client.enter_game()
+            else:
+                task = shared(items_path, lambda: asyncio.to_thread(load_columns, items_path, server_hash))
+                client.items_ingest = asyncio.create_task(install_items(client, task))
             return
 
     except FileNotFoundError:
-        print("Fetching server items.dat...")
+        log.info("Fetching server items.dat...")
 
     client.send_packet(NetMessage.GenericText, "action|refresh_item_data\n")
 
-def onConsoleMessage(var):
+@handlers.on("OnConsoleMessage")
+async def onConsoleMessage(client, var):
     message = var.get(1).as_string()
-    print(message)
\ No newline at end of file
+    log.info("Console: %s", message)
\ No newline at end of file
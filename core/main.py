@@ -1,6 +1,8 @@
+import asyncio
 from core.client import Bot
-from core.manager import load_from_file
+from core.manager import load_columns
 from core.ffi import  enet_initialize
+from core.utils import setup_logging
 
 if enet_initialize() != 0:
     print("Failed to initialize ENet.")
@@ -10,7 +12,8 @@ if __name__ == "__main__":
     username = input("Input your GrowID: ")
     password = input("Input your password: ")
 
-    items_database = load_from_file("cache/items.dat")
+    items_database = load_columns("cache/items.dat")
 
     bot = Bot(username=username, password=password, items_database=items_database)
-    bot.connect()
\ No newline at end of file
+    with setup_logging():
+        asyncio.run(bot.connect())
\ No newline at end of file
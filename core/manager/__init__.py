@@ -1,2 +1,9 @@
 from .items_manager import load_from_file, ItemDatabase
+from .items_cache import LOADER_VERSION, load_cached
+from .items_columns import ItemColumns, ItemView, load_columns
+from .items_lazy import LazyItemDatabase, load_lazy
+from .items_diff import ItemChanges, diff_items
+from .items_ingest import ingest_items
+from .items_search import ItemNameIndex, name_index
+from .items_writer import generate_items, serialize_items
 from .world_manager import World
\ No newline at end of file
@@ -0,0 +1,86 @@
+import marshal
+import os
+from dataclasses import fields
+from typing import Optional
+
+from core.entities.enums import ItemFlag
+from core.entities.struct import Item
+from core.utils import get_logger, write_atomic
+from .items_manager import ItemDatabase, load_from_file
+
+log = get_logger("items")
+
+# Bump whenever load_from_memory starts producing different items, every existing cache is then reparsed once
+LOADER_VERSION = 1
+CACHE_SUFFIX = ".cache"
+FIELDS = tuple(item_field.name for item_field in fields(Item))
+
+def cache_path(items_path: str) -> str:
+    return items_path + CACHE_SUFFIX
+
+def file_key(items_path: str) -> tuple:
+    stat = os.stat(items_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def save_cache(db: ItemDatabase, path: str, items_hash: Optional[int], source_key: tuple) -> None:
+    # Item.__dict__ with plain int flags, marshal rebuilds these dicts in C, far cheaper than a reparse or unpickling dataclasses.
+    # Equal strings share one object so marshal writes the repeats as back references
+    strings = {}
+    rows = []
+    for item_id in sorted(db.items):
+        row = {name: strings.setdefault(value, value) if isinstance(value, str) else value for name, value in db.items[item_id].__dict__.items()}
+        row["flags"] = int(row["flags"])
+        rows.append(row)
+
+    header = (LOADER_VERSION, items_hash, source_key, FIELDS, db.version, db.item_count)
+    write_atomic(path, marshal.dumps((header, rows)))
+
+def load_cache(path: str, items_hash: Optional[int] = None, source_key: Optional[tuple] = None) -> Optional[ItemDatabase]:
+    # Valid when it was built from the same server hash, or from the exact items.dat currently on disk
+    try:
+        with open(path, "rb") as f:
+            # marshal.load on a file reads in small pieces, one read and loads is several times faster
+            header, rows = marshal.loads(f.read())
+        loader_version, cached_hash, cached_key, cached_fields, version, item_count = header
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    if loader_version != LOADER_VERSION or cached_fields != FIELDS:
+        return None
+    if (items_hash is None or cached_hash != items_hash) and cached_key != source_key:
+        return None
+
+    db = ItemDatabase(version, item_count)
+    flag_cache = {}
+    items = db.items
+    new_item = Item.__new__
+
+    for row in rows:
+        bits = row["flags"]
+        item_flags = flag_cache.get(bits)
+        if item_flags is None:
+            item_flags = flag_cache[bits] = ItemFlag.from_bits(bits)
+        row["flags"] = item_flags
+
+        item = new_item(Item)
+        item.__dict__ = row
+        items[row["id"]] = item
+
+    db.loaded = True
+    return db
+
+def load_cached(items_path: str, items_hash: Optional[int] = None) -> ItemDatabase:
+    path = cache_path(items_path)
+    source_key = file_key(items_path)
+
+    db = load_cache(path, items_hash, source_key)
+    if db is not None:
+        return db
+
+    log.info("Parsing %s, no usable cache", items_path)
+    db = load_from_file(items_path)
+    try:
+        save_cache(db, path, items_hash, source_key)
+    except OSError as e:
+        log.warning("Failed to write %s: %s", path, e)
+    return db
\ No newline at end of file
@@ -0,0 +1,375 @@
+import marshal
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Mapping
+from typing import Optional
+
+from core.entities.enums import ItemFlag
+from core.entities.struct import Item
+from core.utils import get_logger, write_atomic
+from .items_cache import FIELDS, LOADER_VERSION, file_key, load_cached
+from .items_manager import ItemDatabase
+
+log = get_logger("items")
+
+COLUMNS_SUFFIX = ".columns"
+PATCH_SUFFIX = ".patch"
+MAGIC = b"GTIC"
+# Bump when the file layout below changes
+LAYOUT_VERSION = 1
+# magic, layout, loader version, items.dat version, item count, has hash, server hash, source size, source mtime, string bytes
+HEADER = struct.Struct("<4sHHHIBIQqI")
+ALIGNMENT = 8
+
+# Fixed-width Item fields and their array typecode, sized like the items.dat fields they come from
+NUMERIC_FIELDS = (
+    ("id", "I"),
+    ("flags", "H"),
+    ("action_type", "B"),
+    ("material", "B"),
+    ("texture_hash", "I"),
+    ("cooking_ingredient", "I"),
+    ("visual_effect", "B"),
+    ("texture_x", "B"),
+    ("texture_y", "B"),
+    ("render_type", "B"),
+    ("is_stripey_wallpaper", "B"),
+    ("collision_type", "B"),
+    ("block_health", "B"),
+    ("drop_chance", "I"),
+    ("clothing_type", "B"),
+    ("rarity", "H"),
+    ("level_required", "B"),
+    ("max_item", "B"),
+    ("file_hash", "I"),
+    ("audio_volume", "I"),
+    ("seed_base_sprite", "B"),
+    ("seed_overlay_sprite", "B"),
+    ("tree_base_sprite", "B"),
+    ("tree_overlay_sprite", "B"),
+    ("base_color", "I"),
+    ("overlay_color", "I"),
+    ("ingredient", "I"),
+    ("grow_time", "I"),
+    ("is_rayman", "H"),
+)
+STRING_FIELDS = (
+    "name",
+    "texture_file_name",
+    "file_name",
+    "pet_name",
+    "pet_prefix",
+    "pet_suffix",
+    "pet_ability",
+    "extra_options",
+    "texture_path_2",
+    "extra_option2",
+    "punch_option",
+    "description",
+)
+STRING_SLOTS = {name: slot for slot, name in enumerate(STRING_FIELDS)}
+
+def columns_path(items_path: str) -> str:
+    return items_path + COLUMNS_SUFFIX
+
+def patch_path(path: str) -> str:
+    return path + PATCH_SUFFIX
+
+def padding(size: int) -> bytes:
+    return bytes(-size % ALIGNMENT)
+
+def write_columns(db, path: str, items_hash: Optional[int], source_key: tuple) -> None:
+    items = [db.items[item_id].__dict__ for item_id in range(db.item_count)]
+
+    # Strings are latin-1 like the items.dat they were sliced from, laid out field by field.
+    # String k of field f spans offsets[f * count + k] to the next offset
+    offsets = array("I", [0])
+    blob = bytearray()
+    for name in STRING_FIELDS:
+        for item in items:
+            blob += item[name].encode("latin-1")
+            offsets.append(len(blob))
+
+    source_size, source_mtime = source_key
+    body = bytearray(HEADER.pack(
+        MAGIC, LAYOUT_VERSION, LOADER_VERSION, db.version, db.item_count,
+        items_hash is not None, items_hash or 0, source_size, source_mtime, len(blob),
+    ))
+    body += padding(len(body))
+    for name, typecode in NUMERIC_FIELDS:
+        column = array(typecode, [item[name] for item in items]).tobytes()
+        body += column + padding(len(column))
+    body += offsets.tobytes()
+    body += blob
+
+    write_atomic(path, body)
+
+class ItemView:
+    __slots__ = ("database", "id")
+
+    def __init__(self, database, item_id):
+        self.database = database
+        self.id = item_id
+
+    def __getattr__(self, name):
+        return self.database.value(name, self.id)
+
+    def __eq__(self, other):
+        if isinstance(other, ItemView):
+            return self.database is other.database and self.id == other.id
+        if isinstance(other, Item):
+            return self.to_item() == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self.database), self.id))
+
+    def __repr__(self):
+        return f"ItemView(id={self.id}, name={self.name!r})"
+
+    def to_item(self) -> Item:
+        item = Item.__new__(Item)
+        item.__dict__ = {name: self.database.value(name, self.id) for name in FIELDS}
+        return item
+
+class ColumnItems(Mapping):
+    # ItemDatabase.items for an ItemColumns, id -> item, read-only
+    def __init__(self, database):
+        self.database = database
+
+    def __getitem__(self, item_id):
+        item = self.database.get_item(item_id) if isinstance(item_id, int) and item_id < self.database.item_count else None
+        if item is None:
+            raise KeyError(item_id)
+        return item
+
+    def __iter__(self):
+        return (item.id for item in self.database)
+
+    def __len__(self):
+        database = self.database
+        count = min(database.stored_count, database.item_count)
+        for item_id, item in database.overrides.items():
+            if item_id >= database.item_count:
+                continue
+            if item is None and item_id < database.stored_count:
+                count -= 1
+            elif item is not None and item_id >= database.stored_count:
+                count += 1
+        return count
+
+class ItemColumns:
+    # Read-only ItemDatabase over a mapped columns file, workers mapping the same file share its pages
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.view = view = memoryview(self.mapping)
+        self.columns = {}
+        self.offsets = self.strings = None
+
+        (
+            magic, layout, self.loader_version, self.version, self.stored_count,
+            has_hash, items_hash, source_size, source_mtime, string_bytes,
+        ) = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or layout != LAYOUT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a columns file of this layout")
+
+        self.items_hash = items_hash if has_hash else None
+        self.source_key = (source_size, source_mtime)
+        # What the file itself was built from, a patch only applies over the file it was written against
+        self.stored_key = (self.items_hash, self.source_key)
+        self.item_count = self.stored_count
+        # Items changed since the file was written, by id, None for removed ones
+        self.overrides = {}
+        self.name_index = None
+        self.loaded = True
+        self.items = ColumnItems(self)
+
+        count = self.stored_count
+        offset = HEADER.size + len(padding(HEADER.size))
+        spans = []
+        for name, typecode in NUMERIC_FIELDS:
+            size = count * array(typecode).itemsize
+            spans.append((name, typecode, offset, size))
+            offset += size + len(padding(size))
+        offsets_size = (len(STRING_FIELDS) * count + 1) * 4
+        if offset + offsets_size + string_bytes > len(self.mapping):
+            self.close()
+            raise ValueError(f"{path} is truncated")
+
+        for name, typecode, start, size in spans:
+            self.columns[name] = view[start:start + size].cast(typecode)
+        self.offsets = view[offset:offset + offsets_size].cast("I")
+        offset += offsets_size
+        self.strings = view[offset:offset + string_bytes]
+        self.flag_cache = {}
+
+    def __len__(self):
+        return self.item_count
+
+    def __iter__(self):
+        items = (self.get_item(item_id) for item_id in range(self.item_count))
+        return (item for item in items if item is not None)
+
+    def get_item(self, id: int) -> Optional[ItemView]:
+        if id in self.overrides:
+            return self.overrides[id]
+        if 0 <= id < self.stored_count:
+            return ItemView(self, id)
+        return None
+
+    def apply_changes(self, changes) -> None:
+        # The mapping is read-only, changed items become plain Items layered over it until the file is rebuilt
+        for item_id in changes.removed:
+            self.overrides[item_id] = None
+        for item_id, delta in changes.modified.items():
+            item = self.get_item(item_id)
+            if isinstance(item, ItemView):
+                item = self.overrides[item_id] = item.to_item()
+            for name, (_, value) in delta.items():
+                setattr(item, name, value)
+        self.overrides.update(changes.added)
+        if changes.renames():
+            self.name_index = None
+        if changes.items_hash is not None:
+            self.items_hash = changes.items_hash
+        self.version = changes.version
+        self.item_count = changes.item_count
+
+    def item_names(self):
+        overrides = self.overrides
+        for item_id in range(self.item_count):
+            if item_id in overrides:
+                item = overrides[item_id]
+                if item is not None:
+                    yield item_id, item.name
+            elif item_id < self.stored_count:
+                yield item_id, self.value("name", item_id)
+
+    def patch_rows(self, changes) -> dict:
+        # The overrides once changes are applied, as rows for write_patch. Built on copies, the event loop keeps reading self
+        rows = {item_id: None if item is None else dict(item.__dict__) for item_id, item in self.overrides.items()}
+        for item_id in changes.removed:
+            rows[item_id] = None
+        for item_id, delta in changes.modified.items():
+            row = rows.get(item_id)
+            if row is None:
+                row = rows[item_id] = self.get_item(item_id).to_item().__dict__
+            for name, (_, value) in delta.items():
+                row[name] = value
+        for item_id, item in changes.added.items():
+            rows[item_id] = dict(item.__dict__)
+        for row in rows.values():
+            if row is not None:
+                row["flags"] = int(row["flags"])
+        return rows
+
+    def layer(self, rows: dict, version: int, item_count: int, items_hash: Optional[int], source_key: tuple) -> None:
+        # Puts a patch written by write_patch over the mapped items
+        for item_id, row in rows.items():
+            item = None
+            if row is not None:
+                bits = row["flags"]
+                flags = self.flag_cache.get(bits)
+                if flags is None:
+                    flags = self.flag_cache[bits] = ItemFlag.from_bits(bits)
+                row["flags"] = flags
+                item = Item.__new__(Item)
+                item.__dict__ = row
+            self.overrides[item_id] = item
+        self.version = version
+        self.item_count = item_count
+        self.items_hash = items_hash
+        self.source_key = source_key
+
+    def value(self, name: str, item_id: int):
+        column = self.columns.get(name)
+        if column is not None:
+            value = column[item_id]
+            if name == "flags":
+                flags = self.flag_cache.get(value)
+                if flags is None:
+                    flags = self.flag_cache[value] = ItemFlag.from_bits(value)
+                return flags
+            return value
+
+        slot = STRING_SLOTS.get(name)
+        if slot is None:
+            raise AttributeError(name)
+        index = slot * self.stored_count + item_id
+        return str(self.strings[self.offsets[index]:self.offsets[index + 1]], "latin-1")
+
+    def close(self) -> None:
+        # Every exported view has to go before the mapping can be closed
+        for column in self.columns.values():
+            column.release()
+        for view in (self.offsets, self.strings, self.view):
+            if view is not None:
+                view.release()
+        self.mapping.close()
+
+def write_patch(columns: ItemColumns, changes, items_hash: Optional[int], source_key: tuple) -> None:
+    # Everything changed since the columns file was written, so a patch costs what changed rather than a rebuild of the file
+    header = (LOADER_VERSION, FIELDS, columns.stored_key, items_hash, source_key, changes.version, changes.item_count)
+    write_atomic(patch_path(columns.path), marshal.dumps((header, columns.patch_rows(changes))))
+
+def read_patch(columns: ItemColumns) -> Optional[tuple]:
+    try:
+        with open(patch_path(columns.path), "rb") as f:
+            header, rows = marshal.loads(f.read())
+        loader_version, patch_fields, stored_key, items_hash, source_key, version, item_count = header
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    if loader_version != LOADER_VERSION or patch_fields != FIELDS or stored_key != columns.stored_key:
+        return None
+    return rows, version, item_count, items_hash, source_key
+
+def current(built_hash: Optional[int], built_key: tuple, items_hash: Optional[int], source_key: Optional[tuple]) -> bool:
+    # Same rule as the parsed cache: built for this server hash, or from the items.dat currently on disk
+    return (items_hash is not None and built_hash == items_hash) or built_key == source_key
+
+def open_columns(path: str, items_hash: Optional[int] = None, source_key: Optional[tuple] = None) -> Optional[ItemColumns]:
+    # The file with its patch layered on when the patch is current, the file alone when it is
+    try:
+        columns = ItemColumns(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+    if columns.loader_version != LOADER_VERSION:
+        columns.close()
+        return None
+    patch = read_patch(columns)
+    if patch is not None and current(patch[3], patch[4], items_hash, source_key):
+        columns.layer(*patch)
+    elif not current(columns.items_hash, columns.source_key, items_hash, source_key):
+        columns.close()
+        return None
+    return columns
+
+def load_columns(items_path: str, items_hash: Optional[int] = None) -> ItemColumns | ItemDatabase:
+    path = columns_path(items_path)
+    source_key = file_key(items_path)
+
+    columns = open_columns(path, items_hash, source_key)
+    if columns is not None:
+        return columns
+
+    log.info("Building %s", path)
+    db = load_cached(items_path, items_hash)
+    try:
+        write_columns(db, path, items_hash, source_key)
+    except OSError as e:
+        # Windows refuses to replace a file another worker still has mapped, the parsed items serve until the next load
+        log.warning("Failed to write %s: %s", path, e)
+        return db
+    # A patch left over from the old file must not be layered over the new one
+    try:
+        os.unlink(patch_path(path))
+    except FileNotFoundError:
+        pass
+    return ItemColumns(path)
\ No newline at end of file
@@ -0,0 +1,63 @@
+import hashlib
+import struct
+from dataclasses import dataclass, field
+from typing import Optional
+
+from core.entities.struct import Item
+from .items_cache import FIELDS
+from .items_lazy import LazyItemDatabase
+
+@dataclass(slots=True)
+class ItemChanges:
+    version: int = 0
+    item_count: int = 0
+    items_hash: Optional[int] = None
+    added: dict[int, Item] = field(default_factory=dict)
+    removed: list[int] = field(default_factory=list)
+    # item id -> field name -> (old value, new value)
+    modified: dict[int, dict[str, tuple]] = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.modified)
+
+    def renames(self) -> bool:
+        # Whether applying these changes leaves a name index of the database stale
+        return bool(self.added or self.removed) or any("name" in delta for delta in self.modified.values())
+
+def item_digests(data, offsets) -> list[bytes]:
+    # One digest per item record, equal digests at the same id and version mean the item is unchanged
+    view = memoryview(data)
+    return [hashlib.blake2b(view[start:end], digest_size=8).digest() for start, end in zip(offsets, offsets[1:])]
+
+def field_delta(old: Item, new: Item) -> dict[str, tuple]:
+    old_values = old.__dict__
+    new_values = new.__dict__
+    return {name: (old_values[name], new_values[name]) for name in FIELDS if old_values[name] != new_values[name]}
+
+def diff_items(old_data, new_data) -> ItemChanges:
+    old = LazyItemDatabase(old_data)
+    new = LazyItemDatabase(new_data)
+    changes = ItemChanges(new.version, new.item_count)
+    common = min(old.item_count, new.item_count)
+
+    if old.version == new.version:
+        # Same layout, so only records whose bytes changed need decoding
+        old_digests = item_digests(old_data, old.offsets)
+        new_digests = item_digests(new_data, new.offsets)
+        candidates = [item_id for item_id in range(common) if old_digests[item_id] != new_digests[item_id]]
+    else:
+        candidates = range(common)
+
+    for item_id in candidates:
+        # Bytes the loader skips can change without any field changing
+        delta = field_delta(old.get_item(item_id), new.get_item(item_id))
+        if delta:
+            changes.modified[item_id] = delta
+
+    for item_id in range(common, new.item_count):
+        changes.added[item_id] = new.get_item(item_id)
+    changes.removed.extend(range(common, old.item_count))
+    return changes
+
+def items_header(data) -> tuple:
+    return struct.unpack_from("<HI", data, 0)
\ No newline at end of file
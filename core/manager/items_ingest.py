@@ -0,0 +1,84 @@
+import os
+import tempfile
+import zlib
+from typing import Optional
+
+from core.utils import Hasher, file_hash, get_logger, store_file_hash
+from .items_cache import file_key
+from .items_columns import ItemColumns, columns_path, load_columns, patch_path, write_patch
+from .items_diff import ItemChanges, diff_items, items_header
+
+log = get_logger("items")
+
+INGEST_CHUNK = 1 << 16
+
+def write_items(compressed, items_path: str, keep: bool = False) -> tuple[int, Optional[bytes]]:
+    # Decompresses, hashes and writes in chunks, readers only ever see the old file or the complete new one.
+    # With keep the decompressed file is also returned
+    data = memoryview(compressed)
+    decompressor = zlib.decompressobj()
+    hasher = Hasher()
+    kept = []
+
+    fd, temp_path = tempfile.mkstemp(prefix=".items.", suffix=".tmp", dir=os.path.dirname(items_path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for start in range(0, len(data), INGEST_CHUNK):
+                chunk = decompressor.decompress(data[start:start + INGEST_CHUNK])
+                hasher.update(chunk)
+                f.write(chunk)
+                if keep:
+                    kept.append(chunk)
+            chunk = decompressor.flush()
+            hasher.update(chunk)
+            f.write(chunk)
+            if keep:
+                kept.append(chunk)
+            if not decompressor.eof:
+                raise ValueError("items.dat data is truncated")
+        os.replace(temp_path, items_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    store_file_hash(items_path, hasher.digest())
+    return hasher.digest(), b"".join(kept) if keep else None
+
+def read_previous(items_path: str, live) -> Optional[bytes]:
+    # The items.dat about to be replaced, if live was loaded from it and can be patched
+    if live is None or not hasattr(live, "apply_changes"):
+        return None
+    try:
+        previous_hash = file_hash(items_path)
+        with open(items_path, "rb") as f:
+            previous = f.read()
+    except FileNotFoundError:
+        return None
+
+    if (live.version, live.item_count) != items_header(previous):
+        return None
+    if getattr(live, "items_hash", None) not in (None, previous_hash):
+        return None
+    return previous
+
+def ingest_items(compressed, items_path: str, live=None) -> tuple[Optional[ItemColumns], Optional[ItemChanges]]:
+    # Blocking, meant for a worker thread: zlib and the native hash release the GIL, the parse shares it with the event loop.
+    # Returns the changes to apply to live when it can be patched, a freshly loaded database otherwise
+    previous = read_previous(items_path, live)
+    items_hash, current = write_items(compressed, items_path, keep=previous is not None)
+    log.info("Wrote %s, hash %d", items_path, items_hash)
+
+    if previous is not None:
+        changes = diff_items(previous, current)
+        changes.items_hash = items_hash
+        # The columns file goes stale with items.dat, the patch next to it brings it up to date without rewriting it
+        if isinstance(live, ItemColumns) and live.path == columns_path(items_path):
+            try:
+                write_patch(live, changes, items_hash, file_key(items_path))
+            except OSError as e:
+                log.warning("Failed to write %s: %s", patch_path(live.path), e)
+        return None, changes
+    return load_columns(items_path, items_hash), None
\ No newline at end of file
@@ -0,0 +1,145 @@
+import mmap
+import struct
+from array import array
+from typing import Iterable, Optional
+
+from core.entities.enums import ItemFlag
+from core.entities.struct import Item
+from .items_manager import FILE, HEADER, KEYSTREAM, LEVELS, SECRET, SPRITES, TAIL_SLOTS, TEXTURE, U16, tail_plan
+
+# An item record as (fixed-width run or None, the Item fields it holds, the string that follows it).
+# Every run ends with the u16 length of that string, None in the field names is read and dropped
+RECORD = (
+    (HEADER, ("id", "flags", "action_type", "material"), "name"),
+    (None, (), "texture_file_name"),
+    (TEXTURE, (
+        "texture_hash", "visual_effect", "cooking_ingredient", "texture_x", "texture_y", "render_type",
+        "is_stripey_wallpaper", "collision_type", "block_health", "drop_chance", "clothing_type", "rarity", "max_item",
+    ), "file_name"),
+    (FILE, ("file_hash", "audio_volume"), "pet_name"),
+    (None, (), "pet_prefix"),
+    (None, (), "pet_suffix"),
+    (None, (), "pet_ability"),
+    (SPRITES, (
+        "seed_base_sprite", "seed_overlay_sprite", "tree_base_sprite", "tree_overlay_sprite",
+        "base_color", "overlay_color", "ingredient", "grow_time", None, "is_rayman",
+    ), "extra_options"),
+    (None, (), "texture_path_2"),
+    (None, (), "extra_option2"),
+)
+RECORD_PADDING = 80
+TAIL_FIELDS = tuple(sorted(TAIL_SLOTS, key=TAIL_SLOTS.get))
+
+def decrypt_name(raw, item_id: int) -> str:
+    start = item_id % len(SECRET)
+    return str((int.from_bytes(raw, "little") ^ int.from_bytes(KEYSTREAM[start:start + len(raw)], "little")).to_bytes(len(raw), "little"), "latin-1")
+
+def record_skips(version: int):
+    # Bytes to skip before each u16 string length in a record of this version, plus the bytes after the last string
+    skips = [(run.size - 2) if run else 0 for run, _, _ in RECORD]
+    plan, trailing = tail_plan(version)
+    padding = RECORD_PADDING
+    for skip, _ in plan:
+        skips.append(padding + skip)
+        padding = 0
+    return tuple(skips), trailing + padding
+
+def index_items(data, item_count: int, version: int) -> array:
+    # One pass that only follows the string lengths, offsets[i] is where item i starts and offsets[item_count] where the last one ends
+    skips, trailing = record_skips(version)
+    unpack_u16 = U16.unpack_from
+    unpack_id = struct.Struct("<I").unpack_from
+    offsets = array("I")
+    offset = 6
+
+    for expected_id in range(item_count):
+        if unpack_id(data, offset)[0] != expected_id:
+            raise ValueError("Item ID mismatch")
+        offsets.append(offset)
+        for skip in skips:
+            offset += skip
+            offset += 2 + unpack_u16(data, offset)[0]
+        offset += trailing
+
+    if offset > len(data):
+        raise ValueError("items.dat is truncated")
+    offsets.append(offset)
+    return offsets
+
+class LazyItemDatabase:
+    # Indexes items.dat up front and decodes an Item the first time it is asked for.
+    # With a field projection only those fields are decoded, the rest keep the Item defaults
+    def __init__(self, data, fields: Optional[Iterable[str]] = None):
+        self.data = data
+        self.version, self.item_count = struct.unpack_from("<HI", data, 0)
+        self.offsets = index_items(data, self.item_count, self.version)
+        self.fields = None if fields is None else frozenset(fields) | {"id"}
+        if self.fields is not None and "level_required" in self.fields:
+            self.fields |= {"rarity"}
+        self.tail = tail_plan(self.version)[0]
+        self.decoded = {}
+        self.name_index = None
+        self.loaded = True
+
+    def __len__(self):
+        return self.item_count
+
+    def get_item(self, id: int) -> Optional[Item]:
+        item = self.decoded.get(id)
+        if item is None and 0 <= id < self.item_count:
+            item = self.decoded[id] = self.decode(id)
+        return item
+
+    def item_names(self):
+        # (id, name) straight from the records, nothing gets decoded or kept
+        data = self.data
+        for item_id in range(self.item_count):
+            start = self.offsets[item_id] + HEADER.size
+            length, = U16.unpack_from(data, start - 2)
+            yield item_id, decrypt_name(data[start:start + length], item_id)
+
+    def decode(self, item_id: int) -> Item:
+        data = self.data
+        wanted = self.fields
+        values = {}
+        offset = self.offsets[item_id]
+
+        for run, names, string in RECORD:
+            if run is None:
+                length, = U16.unpack_from(data, offset)
+            else:
+                *fixed, length = run.unpack_from(data, offset)
+                for name, value in zip(names, fixed):
+                    if name is not None and (wanted is None or name in wanted):
+                        values[name] = value
+            offset += run.size if run else 2
+
+            if wanted is None or string in wanted:
+                raw = data[offset:offset + length]
+                values[string] = decrypt_name(raw, item_id) if string == "name" else str(raw, "latin-1")
+            offset += length
+
+        offset += RECORD_PADDING
+        for skip, slot in self.tail:
+            offset += skip
+            length, = U16.unpack_from(data, offset)
+            offset += 2
+            string = TAIL_FIELDS[slot]
+            if string is not None and (wanted is None or string in wanted):
+                values[string] = str(data[offset:offset + length], "latin-1")
+            offset += length
+
+        if "flags" in values:
+            values["flags"] = ItemFlag.from_bits(values["flags"])
+        if wanted is None or "level_required" in wanted:
+            values["level_required"] = LEVELS[values["rarity"]]
+
+        item = Item()
+        item.__dict__.update(values)
+        return item
+
+def load_lazy(path: str, fields: Optional[Iterable[str]] = None) -> LazyItemDatabase:
+    # Mapped rather than read, only the pages of items that get decoded stay hot
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return LazyItemDatabase(data, fields)
\ No newline at end of file
@@ -1,3 +1,4 @@
+import struct
 from dataclasses import dataclass, field
 from typing import Optional
 
@@ -6,6 +7,33 @@ from core.entities.struct import Item
 from core.utils import PacketReader
 
 SECRET = b"PBG892FXX982ABC*"
+# SECRET repeated past the longest possible name, item names are XORed with a slice of it starting at id % 16
+KEYSTREAM = SECRET * (0x10000 // len(SECRET) + 2)
+
+# Fixed-width runs of an item record, each ends with the u16 length of the string that follows it
+HEADER = struct.Struct("<IHBBH")
+TEXTURE = struct.Struct("<IBIBBBBBBIBHBH")
+FILE = struct.Struct("<IIH")
+SPRITES = struct.Struct("<BBBBIIIIHHH")
+U16 = struct.Struct("<H")
+
+# Fields past the 80 skipped bytes, by the version that introduced them: a byte count to skip or a string field (None is read and dropped)
+VERSION_TAIL = (
+    (11, "punch_option"),
+    (12, 13),
+    (13, 4),
+    (14, 4),
+    (15, 25),
+    (15, None),
+    (16, None),
+    (17, 4),
+    (18, 4),
+    (19, 9),
+    (21, 2),
+    (22, "description"),
+    (23, 4),
+    (24, 1),
+)
 
 @dataclass(slots=True)
 class ItemDatabase:
@@ -13,6 +41,7 @@ class ItemDatabase:
     item_count: int = 0
     items: dict[int, Item] = field(default_factory=dict)
     loaded: bool = False
+    name_index: object = field(default=None, repr=False, compare=False)
 
     def add_item(self, item: Item):
         self.items[item.id] = item
@@ -20,7 +49,188 @@ class ItemDatabase:
     def get_item(self, id: int) -> Optional[Item]:
         return self.items.get(id)
 
+    def item_names(self):
+        return ((item_id, self.items[item_id].name) for item_id in sorted(self.items))
+
+    def apply_changes(self, changes) -> None:
+        # Modified items are updated on the existing objects, so references held elsewhere see the new values
+        for item_id in changes.removed:
+            self.items.pop(item_id, None)
+        for item_id, delta in changes.modified.items():
+            item = self.items[item_id]
+            for name, (_, value) in delta.items():
+                setattr(item, name, value)
+        self.items.update(changes.added)
+        if changes.renames():
+            self.name_index = None
+        self.version = changes.version
+        self.item_count = changes.item_count
+
+TAIL_SLOTS = {"punch_option": 0, "description": 1, None: 2}
+
+def tail_plan(version: int):
+    # Collapses VERSION_TAIL into (bytes to skip, slot of the string that follows) steps plus the bytes left over after the last string
+    plan = []
+    skip = 0
+    for since, step in VERSION_TAIL:
+        if version < since:
+            continue
+        if isinstance(step, int):
+            skip += step
+        else:
+            plan.append((skip, TAIL_SLOTS[step]))
+            skip = 0
+    return tuple(plan), skip
+
 def load_from_memory(data: bytes) -> ItemDatabase:
+    data = bytes(data)
+    # latin-1 maps every byte to the code point of the same value, so byte offsets index this str directly
+    text = data.decode("latin-1")
+    db = ItemDatabase()
+    db.version, db.item_count = struct.unpack_from("<HI", data, 0)
+    offset = 6
+
+    plan, trailing = tail_plan(db.version)
+    unpack_header = HEADER.unpack_from
+    unpack_texture = TEXTURE.unpack_from
+    unpack_file = FILE.unpack_from
+    unpack_sprites = SPRITES.unpack_from
+    unpack_u16 = U16.unpack_from
+    keystream = KEYSTREAM
+    secret_length = len(SECRET)
+    flag_cache = {}
+    levels = LEVELS
+    items = db.items
+    new_item = Item.__new__
+
+    for expected_id in range(db.item_count):
+        item_id, flags, action_type, material, length = unpack_header(data, offset)
+        offset += 10
+        if item_id != expected_id:
+            raise ValueError("Item ID mismatch")
+
+        # Bulk XOR of the name against the keystream through big ints
+        start = item_id % secret_length
+        name = (
+            int.from_bytes(data[offset:offset + length], "little") ^ int.from_bytes(keystream[start:start + length], "little")
+        ).to_bytes(length, "little").decode("latin-1")
+        offset += length
+
+        length, = unpack_u16(data, offset)
+        offset += 2
+        texture_file_name = text[offset:offset + length]
+        offset += length
+
+        (
+            texture_hash, visual_effect, cooking_ingredient, texture_x, texture_y, render_type,
+            is_stripey_wallpaper, collision_type, block_health, drop_chance, clothing_type, rarity, max_item, length,
+        ) = unpack_texture(data, offset)
+        offset += 25
+        file_name = text[offset:offset + length]
+        offset += length
+
+        file_hash, audio_volume, length = unpack_file(data, offset)
+        offset += 10
+        pet_name = text[offset:offset + length]
+        offset += length
+        length, = unpack_u16(data, offset)
+        offset += 2
+        pet_prefix = text[offset:offset + length]
+        offset += length
+        length, = unpack_u16(data, offset)
+        offset += 2
+        pet_suffix = text[offset:offset + length]
+        offset += length
+        length, = unpack_u16(data, offset)
+        offset += 2
+        pet_ability = text[offset:offset + length]
+        offset += length
+
+        (
+            seed_base_sprite, seed_overlay_sprite, tree_base_sprite, tree_overlay_sprite,
+            base_color, overlay_color, ingredient, grow_time, _, is_rayman, length,
+        ) = unpack_sprites(data, offset)
+        offset += 26
+        extra_options = text[offset:offset + length]
+        offset += length
+        length, = unpack_u16(data, offset)
+        offset += 2
+        texture_path_2 = text[offset:offset + length]
+        offset += length
+        length, = unpack_u16(data, offset)
+        offset += 2
+        extra_option2 = text[offset:offset + length]
+        offset += length + 80
+
+        tail = ["", "", ""]
+        for skip, slot in plan:
+            offset += skip
+            length, = unpack_u16(data, offset)
+            offset += 2
+            tail[slot] = text[offset:offset + length]
+            offset += length
+        offset += trailing
+
+        item_flags = flag_cache.get(flags)
+        if item_flags is None:
+            item_flags = flag_cache[flags] = ItemFlag.from_bits(flags)
+
+        # Filling __dict__ directly skips the 41 argument dataclass __init__
+        item = new_item(Item)
+        item.__dict__ = {
+            "id": item_id,
+            "flags": item_flags,
+            "action_type": action_type,
+            "material": material,
+            "name": name,
+            "texture_file_name": texture_file_name,
+            "texture_hash": texture_hash,
+            "cooking_ingredient": cooking_ingredient,
+            "visual_effect": visual_effect,
+            "texture_x": texture_x,
+            "texture_y": texture_y,
+            "render_type": render_type,
+            "is_stripey_wallpaper": is_stripey_wallpaper,
+            "collision_type": collision_type,
+            "block_health": block_health,
+            "drop_chance": drop_chance,
+            "clothing_type": clothing_type,
+            "rarity": rarity,
+            "level_required": levels[rarity],
+            "max_item": max_item,
+            "file_name": file_name,
+            "file_hash": file_hash,
+            "audio_volume": audio_volume,
+            "pet_name": pet_name,
+            "pet_prefix": pet_prefix,
+            "pet_suffix": pet_suffix,
+            "pet_ability": pet_ability,
+            "seed_base_sprite": seed_base_sprite,
+            "seed_overlay_sprite": seed_overlay_sprite,
+            "tree_base_sprite": tree_base_sprite,
+            "tree_overlay_sprite": tree_overlay_sprite,
+            "base_color": base_color,
+            "overlay_color": overlay_color,
+            "ingredient": ingredient,
+            "grow_time": grow_time,
+            "is_rayman": is_rayman,
+            "extra_options": extra_options,
+            "texture_path_2": texture_path_2,
+            "extra_option2": extra_option2,
+            "punch_option": tail[0],
+            "description": tail[1],
+        }
+        items[item_id] = item
+
+    if offset > len(data):
+        raise ValueError("items.dat is truncated")
+
+    db.loaded = True
+
+    return db
+
+# Field by field reader kept as the reference for load_from_memory, see benchmarks/items_loader.py
+def load_from_memory_reference(data: bytes) -> ItemDatabase:
     reader = PacketReader(data)
     
     db = ItemDatabase()
@@ -134,4 +344,7 @@ def decrypt_item_name(reader: PacketReader, item_id: int) -> str:
 def level_required(rarity: int) -> int:
     if 1 <= rarity <= 99:
         return min(20, (rarity - 1) // 5 + 3)
-    return 0
\ No newline at end of file
+    return 0
+
+# level_required for every u16 rarity, only 1..99 map to a level
+LEVELS = tuple(level_required(rarity) for rarity in range(100)) + (0,) * (0x10000 - 100)
\ No newline at end of file
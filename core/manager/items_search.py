@@ -0,0 +1,172 @@
+import heapq
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from math import ceil
+from typing import Optional
+
+# Scores a match kind starts at, fuzzy matches score their trigram similarity in [0, 1)
+EXACT = 4.0
+FOLDED = 3.0
+PREFIX = 2.0
+FUZZY_CUTOFF = 0.3
+# Names sharing the most trigrams with a query that get scored exactly
+FUZZY_CANDIDATES = 32
+# Trigrams found in more than one name in this many are kept as a bitset over the names, which is smaller than their postings
+BITSET_SHARE = 32
+NONZERO = re.compile(b"[^\x00]")
+# The set bits of every byte value
+BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+def fold(name: str) -> str:
+    return " ".join(name.casefold().split())
+
+def trigrams(folded: str) -> set[str]:
+    padded = f"  {folded} "
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+def bitset(positions, size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+def set_bits(mask: int, limit: int) -> list[int]:
+    # Positions of the lowest limit set bits, the regex skips the zero bytes in C
+    positions = []
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for match in NONZERO.finditer(data):
+        start = match.start()
+        positions.extend(map((start * 8).__add__, BYTE_BITS[data[start]]))
+        if len(positions) >= limit:
+            return positions[:limit]
+    return positions
+
+class ItemNameIndex:
+    # Built once from a database, name_index() replaces it when the database is reloaded or its names are patched
+    def __init__(self, db):
+        self.names = {}
+        self.exact = defaultdict(list)
+        self.folded = defaultdict(list)
+
+        # Names only, a lazy database is not decoded for them
+        for item_id, name in db.item_names():
+            if not name:
+                continue
+            self.names[item_id] = name
+            self.exact[name].append(item_id)
+            self.folded[fold(name)].append(item_id)
+        self.exact = dict(self.exact)
+        self.folded = dict(self.folded)
+
+        # Folded names sorted for prefix ranges
+        self.sorted = sorted(self.folded)
+
+        # Trigrams point at slots rather than ids, so items sharing a name are counted once. Slots number the names
+        # fewest trigrams first: at an equal shared count the shorter name is the better match and comes first
+        name_grams = {folded: trigrams(folded) for folded in self.sorted}
+        self.slots = sorted(self.sorted, key=lambda folded: len(name_grams[folded]))
+        self.gram_counts = array("H", (len(name_grams[folded]) for folded in self.slots))
+        grams = defaultdict(lambda: array("I"))
+        for slot, folded in enumerate(self.slots):
+            for gram in name_grams[folded]:
+                grams[gram].append(slot)
+        common = len(self.slots) // BITSET_SHARE
+        self.grams = {gram: bitset(posting, len(self.slots)) if len(posting) > common else posting for gram, posting in grams.items()}
+        self.everything = (1 << len(self.slots)) - 1
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, name: str) -> Optional[int]:
+        # The lowest id named exactly name, or failing that the lowest id named name in any case
+        ids = self.exact.get(name) or self.folded.get(fold(name))
+        return ids[0] if ids else None
+
+    def prefixed(self, prefix: str, limit: int = 10) -> list[int]:
+        # Ids whose folded name starts with prefix, shortest names first
+        folded = fold(prefix)
+        names = self.sorted[bisect_left(self.sorted, folded):bisect_right(self.sorted, folded + "\U0010ffff")]
+        ids = []
+        for name in heapq.nsmallest(limit, names, key=len):
+            ids.extend(self.folded[name])
+        return ids[:limit]
+
+    def scored(self, query: str, limit: int = 10) -> list[tuple[int, float]]:
+        folded = fold(query)
+        if not folded:
+            return []
+        scores = {}
+        for item_id in self.exact.get(query, ()):
+            scores[item_id] = EXACT
+        for item_id in self.folded.get(folded, ()):
+            scores.setdefault(item_id, FOLDED)
+        if len(scores) < limit:
+            for item_id in self.prefixed(folded, limit):
+                scores.setdefault(item_id, PREFIX + len(folded) / len(fold(self.names[item_id])))
+
+        if len(scores) < limit:
+            for similarity, slot in self.similar(folded, limit):
+                for item_id in self.folded[self.slots[slot]][:limit - len(scores)]:
+                    scores.setdefault(item_id, similarity)
+
+        ranked = sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))
+        return ranked[:limit]
+
+    def similar(self, folded: str, limit: int) -> list[tuple[float, int]]:
+        # The names whose trigram sets are most like the query's by Jaccard similarity, as (similarity, slot).
+        # How many query trigrams every name shares is added up on bitsets, bit i of each name's count in slices[i], so
+        # a lookup costs a few big integer operations per trigram rather than a step per posting
+        grams = trigrams(folded)
+        slices = []
+        for gram in grams:
+            bits = self.grams.get(gram)
+            if bits is None:
+                continue
+            if not isinstance(bits, int):
+                bits = bitset(bits, len(self.slots))
+            for level, counter in enumerate(slices):
+                slices[level] = counter ^ bits
+                bits &= counter
+                if not bits:
+                    break
+            else:
+                slices.append(bits)
+
+        # The names sharing the most trigrams, lowest slots first within a count. Splitting the names on each slice from
+        # the top bit down and taking the half with the bit set first visits the counts in descending order.
+        # Below needed shared trigrams the similarity cannot reach the cutoff
+        needed = max(1, ceil(FUZZY_CUTOFF * len(grams)))
+        candidates = []
+        stack = [(self.everything, len(slices) - 1, 0)]
+        while stack and len(candidates) < FUZZY_CANDIDATES:
+            names, level, count = stack.pop()
+            if count | ((1 << level + 1) - 1) < needed:
+                continue
+            if level < 0:
+                candidates.extend((count, slot) for slot in set_bits(names, FUZZY_CANDIDATES - len(candidates)))
+                continue
+            high = names & slices[level]
+            if names != high:
+                stack.append((names ^ high, level - 1, count))
+            if high:
+                stack.append((high, level - 1, count | 1 << level))
+
+        similar = []
+        for shared, slot in candidates:
+            similarity = shared / (len(grams) + self.gram_counts[slot] - shared)
+            if similarity >= FUZZY_CUTOFF:
+                similar.append((similarity, slot))
+        # Every name holds at least one id, so the best limit names are enough
+        return heapq.nlargest(limit, similar, key=lambda pair: (pair[0], -pair[1]))
+
+    def search(self, query: str, limit: int = 10) -> list[int]:
+        # Exact, then case-insensitive, then prefix, then fuzzy matches, best first
+        return [item_id for item_id, _ in self.scored(query, limit)]
+
+def name_index(db) -> ItemNameIndex:
+    index = db.name_index
+    if index is None:
+        index = db.name_index = ItemNameIndex(db)
+    return index
\ No newline at end of file
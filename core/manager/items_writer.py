@@ -0,0 +1,126 @@
+import random
+import struct
+
+from core.entities.enums import ItemFlag
+from core.entities.struct import Item
+from .items_manager import FILE, HEADER, KEYSTREAM, LEVELS, SECRET, SPRITES, TEXTURE, U16, VERSION_TAIL, ItemDatabase
+
+# Bytes the loaders skip (the 80 after extra_option2, the u16 before is_rayman and the version padding) are written as zeros,
+# so serialize_items(load_from_memory(data)) == data holds for any file whose unread bytes are zero, generated ones included
+
+def pack_string(value: str) -> bytes:
+    raw = value.encode("latin-1")
+    return U16.pack(len(raw)) + raw
+
+def encrypt_item_name(name: str, item_id: int) -> bytes:
+    raw = name.encode("latin-1")
+    start = item_id % len(SECRET)
+    return (int.from_bytes(raw, "little") ^ int.from_bytes(KEYSTREAM[start:start + len(raw)], "little")).to_bytes(len(raw), "little")
+
+def pack_item(item, version: int) -> bytes:
+    name = encrypt_item_name(item.name, item.id)
+    texture_file_name = item.texture_file_name.encode("latin-1")
+    file_name = item.file_name.encode("latin-1")
+    pet_name = item.pet_name.encode("latin-1")
+    extra_options = item.extra_options.encode("latin-1")
+
+    out = [
+        HEADER.pack(item.id, int(item.flags), item.action_type, item.material, len(name)),
+        name,
+        U16.pack(len(texture_file_name)),
+        texture_file_name,
+        TEXTURE.pack(
+            item.texture_hash, item.visual_effect, item.cooking_ingredient, item.texture_x, item.texture_y, item.render_type,
+            item.is_stripey_wallpaper, item.collision_type, item.block_health, item.drop_chance, item.clothing_type, item.rarity,
+            item.max_item, len(file_name),
+        ),
+        file_name,
+        FILE.pack(item.file_hash, item.audio_volume, len(pet_name)),
+        pet_name,
+        pack_string(item.pet_prefix),
+        pack_string(item.pet_suffix),
+        pack_string(item.pet_ability),
+        SPRITES.pack(
+            item.seed_base_sprite, item.seed_overlay_sprite, item.tree_base_sprite, item.tree_overlay_sprite,
+            item.base_color, item.overlay_color, item.ingredient, item.grow_time, 0, item.is_rayman, len(extra_options),
+        ),
+        extra_options,
+        pack_string(item.texture_path_2),
+        pack_string(item.extra_option2),
+        bytes(80),
+    ]
+
+    for since, step in VERSION_TAIL:
+        if version < since:
+            continue
+        if isinstance(step, int):
+            out.append(bytes(step))
+        else:
+            out.append(pack_string(getattr(item, step) if step else ""))
+
+    return b"".join(out)
+
+def serialize_items(db) -> bytes:
+    # Works on anything with version, item_count and get_item, ItemColumns included
+    return struct.pack("<HI", db.version, db.item_count) + b"".join(pack_item(db.get_item(item_id), db.version) for item_id in range(db.item_count))
+
+WORDS = ("Dirt", "Rock", "Lava", "Wooden", "Magic", "Golden", "Crystal", "Steel", "Block", "Door", "Sign", "Lock", "World", "Seed", "Platform", "Background", "Wings", "Hat", "Shirt", "Pants", "Magplant", "Remote", "Chest", "Tree")
+
+def item_name(rng, item_id: int) -> str:
+    if item_id == 0:
+        return "Blank"
+    name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+    # Odd ids are the seed of the item before them, like in the real file
+    return f"{name} Seed" if item_id % 2 else name
+
+def description(rng, name: str) -> str:
+    return " ".join(["This", name, "is"] + [rng.choice(WORDS).lower() for _ in range(rng.randint(8, 40))]) + "."
+
+def generate_item(item_id: int, version: int, rng) -> Item:
+    name = item_name(rng, item_id)
+    is_clothing = rng.random() < 0.2
+    slug = name.lower().replace(" ", "_")
+
+    item = Item(id=item_id, name=name)
+    item.flags = ItemFlag.from_bits(rng.choice((0, 0, 0x1, 0x4, 0x10, 0x2000)))
+    item.action_type = rng.randint(0, 20)
+    if is_clothing:
+        item.texture_file_name = f"player_{rng.choice(('hat', 'shirt', 'pants', 'feet', 'back'))}.rttex"
+    else:
+        item.texture_file_name = f"tiles_page{rng.randint(1, 16)}.rttex"
+    item.texture_hash = rng.getrandbits(32)
+    item.texture_x = rng.randint(0, 31)
+    item.texture_y = rng.randint(0, 31)
+    item.render_type = 1
+    item.collision_type = 1
+    item.block_health = rng.randint(1, 12)
+    item.rarity = rng.randint(1, 99)
+    item.level_required = LEVELS[item.rarity]
+    item.max_item = 200
+    item.file_name = f"audio/{slug}.wav" if rng.random() < 0.1 else ""
+    if is_clothing and rng.random() < 0.3:
+        item.pet_name = f"{name} Pet"
+        item.pet_prefix = "Fire"
+        item.pet_suffix = "of Flames"
+        item.pet_ability = "Breathes fire when punching"
+    item.seed_base_sprite = rng.randint(0, 15)
+    item.seed_overlay_sprite = rng.randint(0, 15)
+    item.tree_base_sprite = rng.randint(0, 15)
+    item.tree_overlay_sprite = rng.randint(0, 15)
+    item.base_color = rng.getrandbits(32)
+    item.overlay_color = rng.getrandbits(32)
+    item.grow_time = rng.randint(31, 86400)
+    item.extra_options = rng.choice(("", "", "", "Grows on trees", "Can be placed in locked worlds"))
+    item.texture_path_2 = f"game/{slug}.rttex" if is_clothing else ""
+    # Only versions that store a description get one, so the generated database equals what loading it back gives
+    if version >= 22:
+        item.description = description(rng, name)
+    return item
+
+def generate_items(item_count: int, version: int = 24, seed: int = 0) -> ItemDatabase:
+    # Every item has its own generator, so the same id comes out the same at any database size
+    db = ItemDatabase(version, item_count)
+    for item_id in range(item_count):
+        db.add_item(generate_item(item_id, version, random.Random(seed << 32 | item_id)))
+    db.loaded = True
+    return db
\ No newline at end of file
@@ -5,7 +5,9 @@ from typing import List, Optional
 from core.entities.enums import TileFlag, WeatherType
 from core.entities.struct import *
 from core.manager import ItemDatabase
-from core.utils import PacketReader
+from core.utils import PacketReader, get_logger
+
+log = get_logger("world")
 
 @dataclass(slots=True)
 class Tile:
@@ -252,9 +254,7 @@ class World:
                 cbor_size = reader.u32()
                 cbor_raw = reader.read(cbor_size)
                 value = cbor2.loads(cbor_raw)
-                print(
-                    f"Tile {tile.foreground_item_id} has CBOR value: {value}"
-                )
+                log.debug("Tile %d has CBOR value: %s", tile.foreground_item_id, value)
             except Exception as e:
                 raise RuntimeError("Failed to read CBOR tile data") from e
 
@@ -268,7 +268,7 @@ class World:
         else:
             self.tiles.append(tile)
 
-    def parse(self, data: bytes, item_database: ItemDatabase) -> None:
+    def parse(self, data: bytes | memoryview, item_database: ItemDatabase) -> None:
         self.reset()
         reader = PacketReader(data)
 
@@ -510,7 +510,7 @@ class World:
 
             case 26:  # SolarCollector
                 tile.tile_type = SolarCollector(
-                    reader.read(5)
+                    bytes(reader.read(5))
                 )
 
             case 27:  # Forge
@@ -850,10 +850,12 @@ class World:
                 )
 
             case _:
-                print(
-                    f"[WARN] Unknown tile extra {tile.tile_type} "
-                    f"fg={tile.foreground_item_id} "
-                    f"pos=({tile.x},{tile.y})"
-                    f"offset={reader.offset}"
+                log.warning(
+                    "Unknown tile extra %s fg=%d pos=(%d,%d) offset=%d",
+                    extra_tile_type,
+                    tile.foreground_item_id,
+                    tile.x,
+                    tile.y,
+                    reader.offset,
                 )
                 tile.tile_type = Basic()
\ No newline at end of file
@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import logging
+import cProfile
+import pstats
+import tempfile
+import time
+from collections import Counter
+from core.client.inventory import Inventory
+from core.client.login_info import LoginInfo
+from core.client.ping import PingTracker
+from core.entities.enums import ConnectionState, NetMessage
+from core.handlers import GamePacketHandler, NetMessageHandler, VariantHandler
+from core.manager import World, load_from_file
+from core.utils import CaptureReader, INBOUND, Metrics, setup_logging
+
+class ReplayClient:
+    def __init__(self, items_database=None, cache_dir="cache"):
+        self.username = "replay"
+        self.address = None
+        self.port = None
+        self.redirected = False
+        self.login_info = LoginInfo()
+        self.cache_dir = cache_dir
+        self.items_database = items_database
+        self.items_ingest = None
+        self.inventory = Inventory()
+        self.world = World.new()
+        self.peer = None
+        self.state = ConnectionState.LoggingIn
+        self.now = 0.0
+        self.sent = Counter()
+        self.metrics = Metrics()
+        self.ping = PingTracker(self.clock)
+
+    def clock(self):
+        return self.now
+
+    def set_state(self, state):
+        self.state = state
+
+    def send_packet(self, packet_type, data):
+        self.sent[packet_type.name] += 1
+
+    def send_packet_raw(self, tank_packet):
+        self.sent[NetMessage.GamePacket.name] += 1
+
+    def enter_game(self):
+        self.send_packet(NetMessage.GenericText, "action|enter_game\n")
+        self.redirected = False
+        self.set_state(ConnectionState.InGame)
+
+    def redirect(self, address, port):
+        self.redirected = True
+        self.address = address
+        self.port = port
+        self.set_state(ConnectionState.Redirecting)
+
+    def disconnect(self):
+        self.set_state(ConnectionState.Disconnected)
+
+async def replay(path, client):
+    packets = 0
+    size = 0
+    errors = 0
+
+    with CaptureReader(path) as reader:
+        for timestamp, direction, data in reader:
+            if direction != INBOUND:
+                data.release()
+                continue
+
+            client.now = timestamp
+            try:
+                await NetMessageHandler.handle(client, data)
+                # A live server only sends the world once enter_game follows the items.dat ingest
+                if client.items_ingest is not None:
+                    await client.items_ingest
+                    client.items_ingest = None
+            except Exception as e:
+                errors += 1
+                print(f"Handler failed at {timestamp:.3f}s: {e}")
+            finally:
+                packets += 1
+                size += len(data)
+                data.release()
+
+    return packets, size, errors
+
+def run(path, items_path=None, repeat=1):
+    items_database = load_from_file(items_path) if items_path else None
+    total_packets = 0
+    total_size = 0
+    total_errors = 0
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for _ in range(repeat):
+            client = ReplayClient(items_database, cache_dir)
+            packets, size, errors = asyncio.run(replay(path, client))
+            total_packets += packets
+            total_size += size
+            total_errors += errors
+    elapsed = time.perf_counter() - start
+
+    print(f"Replayed {total_packets} packets ({total_size / 1024:.1f} KiB) in {elapsed:.3f}s, {total_packets / elapsed:.0f} packets/s")
+    if total_errors:
+        print(f"{total_errors} packets raised in their handler")
+    print(f"Replies the client would have sent: {dict(client.sent)}")
+
+    for handler in (NetMessageHandler, GamePacketHandler, VariantHandler):
+        unhandled = handler.registry.stats()
+        if unhandled:
+            print(f"Unhandled in {handler.__name__}: {unhandled}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Feed a packet capture through the handlers without a network.")
+    parser.add_argument("capture", help="capture file written by Bot(capture=...)")
+    parser.add_argument("--items", default=None, help="items.dat to start with, otherwise the capture must contain one")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the capture this many times")
+    parser.add_argument("--profile", action="store_true", help="run under cProfile and print the hottest functions")
+    args = parser.parse_args()
+
+    with setup_logging(logging.WARNING):
+        if args.profile:
+            profiler = cProfile.Profile()
+            profiler.runcall(run, args.capture, args.items, args.repeat)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        else:
+            run(args.capture, args.items, args.repeat)
\ No newline at end of file
@@ -0,0 +1 @@
+from .server import GameServer, ServerConfig
\ No newline at end of file
@@ -0,0 +1,44 @@
+import argparse
+from .loadtest import load_test, serve
+from .server import ServerConfig
+
+if __name__ == "__main__":
+    defaults = ServerConfig()
+    parser = argparse.ArgumentParser(description="Local ENet stand-in for the game server, for end to end and load testing.")
+    parser.add_argument("--address", default=defaults.address)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--max-peers", type=int, default=defaults.max_peers)
+    parser.add_argument("--no-redirect", action="store_true", help="skip the OnSendToServer hop")
+    parser.add_argument("--items", type=int, default=defaults.item_count, help="number of items in the generated items.dat")
+    parser.add_argument("--items-version", type=int, default=defaults.items_version)
+    parser.add_argument("--world-size", type=int, nargs=2, default=(defaults.world_width, defaults.world_height), metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--ping-interval", type=float, default=defaults.ping_interval, help="seconds between pings to each peer, 0 disables them")
+    parser.add_argument("--ping-timeout", type=float, default=defaults.ping_timeout)
+    parser.add_argument("--console-rate", type=float, default=defaults.console_rate, help="console messages per second to each peer")
+    parser.add_argument("--report-interval", type=float, default=defaults.report_interval)
+    parser.add_argument("--bots", type=int, default=0, help="also run this many bots against the server and print a summary")
+    parser.add_argument("--duration", type=float, default=30.0, help="how long the bots stay connected")
+    args = parser.parse_args()
+
+    config = ServerConfig(
+        address=args.address,
+        port=args.port,
+        max_peers=max(args.max_peers, args.bots),
+        redirect=not args.no_redirect,
+        item_count=args.items,
+        items_version=args.items_version,
+        world_width=args.world_size[0],
+        world_height=args.world_size[1],
+        ping_interval=args.ping_interval,
+        ping_timeout=args.ping_timeout,
+        console_rate=args.console_rate,
+        report_interval=args.report_interval,
+    )
+
+    if args.bots > 0:
+        load_test(config, args.bots, args.duration)
+    else:
+        try:
+            serve(config)
+        except KeyboardInterrupt:
+            pass
\ No newline at end of file
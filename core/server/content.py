@@ -0,0 +1,36 @@
+import struct
+from core.manager.items_writer import generate_items, serialize_items
+
+def pack_str(value: str) -> bytes:
+    raw = value.encode("latin-1")
+    return struct.pack("<H", len(raw)) + raw
+
+def build_items_dat(item_count: int, version: int) -> bytes:
+    return serialize_items(generate_items(item_count, version))
+
+def build_world(name: str, width: int, height: int, item_count: int) -> bytes:
+    out = bytearray()
+    out += struct.pack("<HI", 0x19, 0)
+    out += pack_str(name)
+    out += struct.pack("<III", width, height, width * height)
+    out += bytes(5)
+
+    # Air on top, a band of blocks below it, every id kept inside the generated database
+    ground = min(2, item_count - 1)
+    tile = struct.Struct("<HHHH")
+    for i in range(width * height):
+        foreground = ground if i // width >= height // 2 else 0
+        out += tile.pack(foreground, 0, 0, 0)
+
+    out += bytes(12)
+    out += struct.pack("<II", 0, 0)
+    out += struct.pack("<HHH", 0, 0, 0)
+    return bytes(out)
+
+def build_inventory(size: int, item_ids) -> bytes:
+    item_ids = list(item_ids)
+    out = bytearray()
+    out += struct.pack("<BIH", 1, size, len(item_ids))
+    for item_id in item_ids:
+        out += struct.pack("<HBB", item_id, 1, 0)
+    return bytes(out)
\ No newline at end of file
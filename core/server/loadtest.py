@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import tempfile
+from core.client import Bot, Fleet
+from core.ffi import enet_initialize
+from core.utils import setup_logging
+from .server import GameServer
+
+def serve(config, stop=None, results=None):
+    if enet_initialize() != 0:
+        print("Failed to initialize ENet.")
+        raise SystemExit(1)
+
+    snapshot = GameServer(config).run(stop)
+    if results is not None:
+        results.put(snapshot)
+
+async def drive_bots(config, count, duration):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fleet = Fleet(count, new_packet=False)
+        bots = [
+            Bot(username=f"standin{i}", password="standin", fleet=fleet, cache_dir=cache_dir, server=(config.address, config.port))
+            for i in range(count)
+        ]
+
+        task = asyncio.create_task(fleet.connect())
+        await asyncio.sleep(duration)
+        for bot in bots:
+            bot.stop()
+        await task
+
+def load_test(config, count, duration):
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    results = context.Queue()
+    server = context.Process(target=serve, args=(config, stop, results), name="standin-server", daemon=True)
+    server.start()
+
+    try:
+        if enet_initialize() != 0:
+            print("Failed to initialize ENet.")
+            raise SystemExit(1)
+        with setup_logging(logging.WARNING):
+            asyncio.run(drive_bots(config, count, duration))
+    finally:
+        stop.set()
+        try:
+            snapshot = results.get(timeout=10)
+        except queue.Empty:
+            snapshot = None
+        server.join()
+
+    if snapshot is None:
+        print(f"The server process exited with code {server.exitcode} before reporting.")
+        return
+
+    pings = snapshot["pings"]
+    print(f"{count} bots for {duration:.0f}s: {snapshot['logins']} logins, {snapshot['redirects']} redirects")
+    print(f"Pings: {pings['answered']}/{pings['sent']} answered, {pings['timed_out']} timed out, rtt p50 {pings['rtt_p50_ms']:.1f}ms p99 {pings['rtt_p99_ms']:.1f}ms max {pings['rtt_max_ms']:.1f}ms")
\ No newline at end of file
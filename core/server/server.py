@@ -0,0 +1,266 @@
+import ctypes
+import itertools
+import struct
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from core.entities.enums import HashMode, NetGamePacket, NetMessage
+from core.ffi import ENetAddress, ENetEvent, ENetEventType, ENetPacket, enet_address_set_host, enet_host_compress_with_range_coder, enet_host_create, enet_host_flush, enet_host_service, enet_host_use_crc32, enet_packet_create, enet_packet_destroy, enet_packet_view, enet_peer_send
+from core.utils import TankPacket, VariantList, VariantType, hash, read_u32
+from .content import build_inventory, build_items_dat, build_world
+
+# How long a single enet_host_service call may block, in milliseconds
+SERVICE_TIMEOUT = 1
+TICK_INTERVAL = 0.01
+RTT_SAMPLES = 4096
+
+@dataclass(slots=True)
+class ServerConfig:
+    address: str = "127.0.0.1"
+    port: int = 17091
+    max_peers: int = 1024
+    redirect: bool = True
+    item_count: int = 64
+    items_version: int = 24
+    world_width: int = 100
+    world_height: int = 60
+    inventory_size: int = 16
+    # Seconds between PingRequests to each in-game peer, 0 turns pings off
+    ping_interval: float = 1.0
+    ping_timeout: float = 5.0
+    # OnConsoleMessage calls per second to each in-game peer
+    console_rate: float = 0.0
+    report_interval: float = 5.0
+
+@dataclass(slots=True)
+class Session:
+    peer: int
+    user: int
+    in_game: bool = False
+    next_ping: float = 0.0
+    next_console: float = 0.0
+    pings: dict = field(default_factory=dict)
+
+class PingStats:
+    def __init__(self):
+        self.sent = 0
+        self.answered = 0
+        self.timed_out = 0
+        self.unknown = 0
+        self.rtts = deque(maxlen=RTT_SAMPLES)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.rtts:
+            return 0.0
+        ordered = sorted(self.rtts)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def snapshot(self) -> dict:
+        return {
+            "sent": self.sent,
+            "answered": self.answered,
+            "timed_out": self.timed_out,
+            "unknown": self.unknown,
+            "rtt_p50_ms": self.percentile(0.50) * 1000,
+            "rtt_p99_ms": self.percentile(0.99) * 1000,
+            "rtt_max_ms": max(self.rtts, default=0.0) * 1000,
+        }
+
+class GameServer:
+    def __init__(self, config=None, clock=time.monotonic):
+        self.config = config or ServerConfig()
+        self.clock = clock
+        self.sessions = {}
+        self.users = itertools.count(1)
+        self.ping_ids = itertools.count(1)
+        self.stats = PingStats()
+        self.logins = 0
+        self.redirects = 0
+
+        self.items_data = build_items_dat(self.config.item_count, self.config.items_version)
+        self.items_hash = hash(self.items_data, HashMode.FixedLength, len(self.items_data)) & 0xFFFFFFFF
+        self.items_packet = zlib.compress(self.items_data)
+        self.world_data = build_world("STANDIN", self.config.world_width, self.config.world_height, self.config.item_count)
+        self.inventory_data = build_inventory(self.config.inventory_size, range(2, min(self.config.item_count, self.config.inventory_size + 2)))
+
+        address = ENetAddress()
+        if enet_address_set_host(ctypes.byref(address), self.config.address.encode("utf-8")) != 0:
+            raise ValueError(f"Failed to resolve {self.config.address}")
+        address.port = self.config.port
+
+        self.host = enet_host_create(ctypes.byref(address), self.config.max_peers, 2, 0, 0)
+        if self.host is None:
+            raise OSError(f"Failed to bind the ENet server host to {self.config.address}:{self.config.port}")
+
+        enet_host_use_crc32(self.host)
+        enet_host_compress_with_range_coder(self.host)
+
+    def run(self, stop=None) -> dict:
+        event = ENetEvent()
+        next_tick = self.clock()
+        next_report = next_tick + self.config.report_interval
+
+        while stop is None or not stop.is_set():
+            if enet_host_service(self.host, ctypes.byref(event), SERVICE_TIMEOUT) > 0:
+                self.dispatch(event)
+                while enet_host_service(self.host, ctypes.byref(event), 0) > 0:
+                    self.dispatch(event)
+
+            now = self.clock()
+            if now >= next_tick:
+                self.tick(now)
+                enet_host_flush(self.host)
+                next_tick = now + TICK_INTERVAL
+
+            if now >= next_report:
+                self.report()
+                next_report = now + self.config.report_interval
+
+        self.report()
+        return self.snapshot()
+
+    def dispatch(self, event):
+        match event.type:
+            case ENetEventType.CONNECT:
+                self.sessions[event.peer] = Session(event.peer, next(self.users))
+                self.send(event.peer, NetMessage.ServerHello, b"")
+            case ENetEventType.RECEIVE:
+                packet = ctypes.cast(event.packet, ctypes.POINTER(ENetPacket)).contents
+                data = enet_packet_view(packet)
+                try:
+                    session = self.sessions.get(event.peer)
+                    if session is not None and len(data) >= 4:
+                        self.handle(session, NetMessage(read_u32(data)), data[4:])
+                finally:
+                    data.release()
+                    enet_packet_destroy(event.packet)
+            case ENetEventType.DISCONNECT | ENetEventType.DISCONNECT_TIMEOUT:
+                session = self.sessions.pop(event.peer, None)
+                if session is not None:
+                    self.stats.timed_out += len(session.pings)
+
+    def handle(self, session, message_type, payload):
+        match message_type:
+            case NetMessage.GenericText:
+                self.on_text(session, str(payload, "utf-8", errors="ignore"))
+            case NetMessage.GamePacket:
+                tank_packet = TankPacket.decode(payload)
+                if tank_packet.type == NetGamePacket.PingReply.value:
+                    self.on_ping_reply(session, tank_packet)
+
+    def on_text(self, session, text):
+        fields = dict(line.split("|", 1) for line in text.splitlines() if "|" in line)
+
+        if fields.get("action") == "refresh_item_data":
+            self.send_tank(session.peer, TankPacket(type=NetGamePacket.SendItemDatabaseData.value, extended_data=self.items_packet))
+        elif fields.get("action") == "enter_game":
+            self.enter_game(session)
+        elif "ltoken" in fields and self.config.redirect:
+            # First login on the "login server", hand the peer over to the "game server", which is this same host
+            self.redirects += 1
+            self.call_function(
+                session.peer,
+                VariantList()
+                .append("OnSendToServer", VariantType.STRING)
+                .append(self.config.port, VariantType.SIGNED)
+                .append(f"token{session.user}", VariantType.STRING)
+                .append(str(session.user), VariantType.STRING)
+                .append(f"{self.config.address}|0|uuid{session.user}", VariantType.STRING)
+                .append("0", VariantType.STRING),
+            )
+        elif "ltoken" in fields or "token" in fields:
+            self.logins += 1
+            self.call_function(
+                session.peer,
+                VariantList()
+                .append("OnSuperMainStartAcceptLogonHrdxs47254722215a", VariantType.STRING)
+                .append(self.items_hash, VariantType.UNSIGNED),
+            )
+
+    def enter_game(self, session):
+        now = self.clock()
+        session.in_game = True
+        session.next_ping = now + self.config.ping_interval
+        session.next_console = now
+        self.send_tank(session.peer, TankPacket(type=NetGamePacket.SendMapData.value, extended_data=self.world_data))
+        self.send_tank(session.peer, TankPacket(type=NetGamePacket.SendInventoryState.value, extended_data=self.inventory_data))
+
+    def on_ping_reply(self, session, tank_packet):
+        # Clients answer with the request value plus 5000
+        sent_at = session.pings.pop((tank_packet.value - 5000) & 0xFFFFFFFF, None)
+        if sent_at is None:
+            self.stats.unknown += 1
+            return
+        self.stats.answered += 1
+        self.stats.rtts.append(self.clock() - sent_at)
+
+    def tick(self, now):
+        config = self.config
+        for session in self.sessions.values():
+            if not session.in_game:
+                continue
+
+            if session.pings:
+                expired = [ping_id for ping_id, sent_at in session.pings.items() if now - sent_at > config.ping_timeout]
+                for ping_id in expired:
+                    del session.pings[ping_id]
+                self.stats.timed_out += len(expired)
+
+            if config.ping_interval > 0 and now >= session.next_ping:
+                ping_id = next(self.ping_ids) & 0xFFFFFFFF
+                session.pings[ping_id] = now
+                session.next_ping = now + config.ping_interval
+                self.stats.sent += 1
+                self.send_tank(session.peer, TankPacket(type=NetGamePacket.PingRequest.value, value=ping_id))
+
+            if config.console_rate > 0 and now >= session.next_console:
+                session.next_console = now + 1 / config.console_rate
+                self.call_function(
+                    session.peer,
+                    VariantList()
+                    .append("OnConsoleMessage", VariantType.STRING)
+                    .append(f"`oStand-in server tick {now:.2f}``", VariantType.STRING),
+                )
+
+    def call_function(self, peer, variant_list):
+        self.send_tank(peer, TankPacket(type=NetGamePacket.CallFunction.value, net_id=0xFFFFFFFF, extended_data=variant_list.serialize()))
+
+    def send_tank(self, peer, tank_packet):
+        size = tank_packet.encoded_size()
+        packet = enet_packet_create(None, 4 + size, 1)
+        buffer = enet_packet_view(packet.contents)
+        struct.pack_into("<I", buffer, 0, NetMessage.GamePacket.value)
+        tank_packet.encode_into(buffer, 4)
+        buffer.release()
+        self.queue(peer, packet)
+
+    def send(self, peer, message_type, payload):
+        packet = enet_packet_create(None, 4 + len(payload), 1)
+        buffer = enet_packet_view(packet.contents)
+        struct.pack_into("<I", buffer, 0, message_type.value)
+        buffer[4:] = payload
+        buffer.release()
+        self.queue(peer, packet)
+
+    def queue(self, peer, packet):
+        if enet_peer_send(peer, 0, packet) < 0:
+            enet_packet_destroy(packet)
+
+    def snapshot(self) -> dict:
+        return {
+            "peers": len(self.sessions),
+            "in_game": sum(1 for session in self.sessions.values() if session.in_game),
+            "logins": self.logins,
+            "redirects": self.redirects,
+            "pings": self.stats.snapshot(),
+        }
+
+    def report(self):
+        snapshot = self.snapshot()
+        pings = snapshot["pings"]
+        print(
+            f"{snapshot['in_game']}/{snapshot['peers']} peers in game, "
+            f"pings {pings['answered']}/{pings['sent']} answered, {pings['timed_out']} timed out, "
+            f"rtt p50 {pings['rtt_p50_ms']:.1f}ms p99 {pings['rtt_p99_ms']:.1f}ms max {pings['rtt_max_ms']:.1f}ms"
+        )
\ No newline at end of file
@@ -0,0 +1,194 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from core.client import Bot, Fleet
+from core.client.fleet import DEGRADED_HEALTH
+from core.handlers import HandlerProfiler
+from core.manager import load_columns
+from core.ffi import enet_initialize
+from core.utils import setup_logging
+
+STATUS_INTERVAL = 5
+RESTART_DELAY = 5
+ITEMS_PATH = "cache/items.dat"
+
+def load_accounts(path):
+    accounts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            username, _, password = line.partition(":")
+            accounts.append((username, password))
+    return accounts
+
+def shard_accounts(accounts, count):
+    shards = [accounts[i::count] for i in range(count)]
+    return [shard for shard in shards if shard]
+
+def bot_status(bot):
+    return {
+        "online": bot.peer in bot.fleet.sessions,
+        "state": bot.state.name,
+        "world": bot.world.name,
+        "health": round(bot.health(), 3),
+    }
+
+def worker(index, accounts, status_queue, metrics_port=None, profile=None):
+    if enet_initialize() != 0:
+        print("Failed to initialize ENet.")
+        raise SystemExit(1)
+
+    with setup_logging(logging.WARNING):
+        asyncio.run(run_worker(index, accounts, status_queue, metrics_port, profile))
+
+async def run_worker(index, accounts, status_queue, metrics_port=None, profile=None):
+    try:
+        items_database = load_columns(ITEMS_PATH)
+    except FileNotFoundError:
+        items_database = None
+
+    fleet = Fleet(len(accounts), items_database)
+    for username, password in accounts:
+        Bot(username=username, password=password, fleet=fleet)
+
+    if metrics_port is not None:
+        await fleet.serve_metrics(port=metrics_port + index)
+
+    # profile is (mode, directory), each worker dumps its own report on SIGUSR1
+    if profile is not None:
+        mode, directory = profile
+        profiler = HandlerProfiler(mode).enable()
+        profiler.dump_on_signal(os.path.join(directory, f"handlers-{index}.txt"))
+
+    reporter = asyncio.create_task(report_status(index, fleet, status_queue))
+    try:
+        await fleet.connect()
+    finally:
+        reporter.cancel()
+
+async def report_status(index, fleet, status_queue):
+    while True:
+        status = {bot.username: bot_status(bot) for bot in fleet.bots}
+        try:
+            status_queue.put_nowait((index, os.getpid(), status))
+        except queue.Full:
+            pass
+        await asyncio.sleep(STATUS_INTERVAL)
+
+class Supervisor:
+    def __init__(self, accounts, workers=None, metrics_port=None, profile=None):
+        self.context = multiprocessing.get_context("spawn")
+        self.status_queue = self.context.Queue(maxsize=1024)
+        self.shards = shard_accounts(accounts, workers or os.cpu_count() or 1)
+        self.processes = [None] * len(self.shards)
+        self.restart_at = [None] * len(self.shards)
+        self.restarts = [0] * len(self.shards)
+        self.status = {}
+        self.metrics_port = metrics_port
+        self.profile = profile
+
+    def start(self, index):
+        process = self.context.Process(
+            target=worker,
+            args=(index, self.shards[index], self.status_queue, self.metrics_port, self.profile),
+            name=f"bot-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[index] = process
+        self.restart_at[index] = None
+
+    def run(self):
+        # Build the columns file once up front, the workers then only map it and share its pages
+        try:
+            load_columns(ITEMS_PATH).close()
+        except FileNotFoundError:
+            pass
+
+        if self.profile is not None and hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, self.forward_signal)
+
+        for index in range(len(self.shards)):
+            self.start(index)
+
+        try:
+            while any(p is not None for p in self.processes):
+                self.collect(STATUS_INTERVAL)
+                self.check_workers()
+                self.print_status()
+        except KeyboardInterrupt:
+            print("Stopping workers...")
+        finally:
+            self.stop()
+
+    def forward_signal(self, signum, frame):
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                os.kill(process.pid, signum)
+
+    def collect(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+
+            try:
+                index, pid, status = self.status_queue.get(timeout=remaining)
+            except queue.Empty:
+                return
+
+            self.status[index] = (pid, status)
+
+    def check_workers(self):
+        now = time.monotonic()
+        for index, process in enumerate(self.processes):
+            if process is None or process.is_alive():
+                continue
+
+            if process.exitcode == 0:
+                print(f"Worker {index} finished.")
+                self.processes[index] = None
+                continue
+
+            if self.restart_at[index] is None:
+                print(f"Worker {index} crashed with exit code {process.exitcode}, restarting in {RESTART_DELAY}s.")
+                self.restart_at[index] = now + RESTART_DELAY
+            elif now >= self.restart_at[index]:
+                self.restarts[index] += 1
+                self.start(index)
+
+    def print_status(self):
+        for index in range(len(self.shards)):
+            pid, status = self.status.get(index, (None, {}))
+            online = sum(1 for bot in status.values() if bot["online"])
+            degraded = sum(1 for bot in status.values() if bot["state"] == "InGame" and bot["health"] < DEGRADED_HEALTH)
+            print(f"Worker {index} (pid {pid}): {online}/{len(self.shards[index])} online, {degraded} degraded, {self.restarts[index]} restarts")
+
+    def stop(self):
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            if process is not None:
+                process.join()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many accounts across a pool of worker processes.")
+    parser.add_argument("accounts", help="file with one growid:password per line")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: one per core)")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics, worker N listens on this port + N")
+    parser.add_argument("--profile-handlers", metavar="DIR", default=None, help="profile packet handlers, send SIGUSR1 to dump a report per worker into DIR")
+    parser.add_argument("--profile-mode", choices=("wall", "cprofile"), default="wall")
+    args = parser.parse_args()
+
+    profile = (args.profile_mode, args.profile_handlers) if args.profile_handlers else None
+    Supervisor(load_accounts(args.accounts), args.workers, args.metrics_port, profile).run()
\ No newline at end of file
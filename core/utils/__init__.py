@@ -1,5 +1,11 @@
-from .hash import hash
+from .capture import CaptureReader, CaptureWriter, INBOUND, OUTBOUND
+from .files import write_atomic
+from .hash import Hasher, file_hash, hash, store_file_hash
+from .html_extract import find_class_text, find_input_value, find_onclick_links
 from .klv import generate_klv
+from .log import bot_context, get_logger, setup_logging
+from .metrics import BYTES, HANDLER_SECONDS, PACKETS, SERVICE_SECONDS, Metrics, render, serve_metrics, type_name
 from .packet_reader import *
 from .random import hex, mac
-from .variant import VariantList
\ No newline at end of file
+from .tank_packet import TankPacket
+from .variant import VariantList, VariantType
\ No newline at end of file
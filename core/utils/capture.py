@@ -0,0 +1,75 @@
+import mmap
+import struct
+import time
+from typing import Iterator, Tuple
+
+MAGIC = b"GTCP"
+VERSION = 1
+
+INBOUND = 0
+OUTBOUND = 1
+
+# magic, format version
+FILE_HEADER = struct.Struct("<4sH")
+# seconds since the capture started, direction, payload length
+RECORD_HEADER = struct.Struct("<dBI")
+
+class CaptureWriter:
+    def __init__(self, path: str, clock=time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self.file = open(path, "wb")
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def write(self, direction: int, data: bytes | memoryview) -> None:
+        self.file.write(RECORD_HEADER.pack(self.clock() - self.started, direction, len(data)))
+        self.file.write(data)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CaptureReader:
+    def __init__(self, path: str):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+
+        magic, version = FILE_HEADER.unpack_from(self.view, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a packet capture")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported capture version {version}")
+
+    def __iter__(self) -> Iterator[Tuple[float, int, memoryview]]:
+        # Payloads are slices of the mapping, release them before closing the reader
+        offset = FILE_HEADER.size
+        end = len(self.view)
+        while offset + RECORD_HEADER.size <= end:
+            timestamp, direction, length = RECORD_HEADER.unpack_from(self.view, offset)
+            offset += RECORD_HEADER.size
+            if offset + length > end:
+                break
+            yield timestamp, direction, self.view[offset:offset + length]
+            offset += length
+
+    def close(self) -> None:
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
\ No newline at end of file
@@ -0,0 +1,17 @@
+import os
+import tempfile
+
+def write_atomic(path: str, data: bytes) -> None:
+    # Readers only ever see the old file or the complete new one. The temp name is unique, so threads and processes
+    # writing the same path at once each replace it with a whole file
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
\ No newline at end of file
@@ -1,6 +1,12 @@
-import ctypes
 import hashlib
+import os
 from core.entities.enums import HashMode
+from core.ffi import gt_hash_update
+from .files import write_atomic
+
+HASH_SEED = 0x55555555
+HASH_SUFFIX = ".hash"
+FILE_CHUNK = 1 << 20
 
 def sha256(data: str) -> str:
     data = str(data)
@@ -10,20 +16,64 @@ def md5(data: str) -> str:
     data = str(data)
     return hashlib.md5(data.encode('utf-8')).hexdigest()
 
-def hash(data: bytes, mode, length: int = 0) -> int:
-    hash_val = ctypes.c_uint32(0x55555555)
+def hash_update(state: int, data) -> int:
+    # state = data[i] + rotl(state, 5) for every byte, truncated to 32 bits
+    if gt_hash_update is not None:
+        data = bytes(data)
+        return gt_hash_update(state, data, len(data))
+
+    for b in bytes(data):
+        state = (b + (state >> 27) + (state << 5)) & 0xFFFFFFFF
+    return state
+
+class Hasher:
+    __slots__ = ("state",)
+
+    def __init__(self):
+        self.state = HASH_SEED
+
+    def update(self, data) -> "Hasher":
+        self.state = hash_update(self.state, data)
+        return self
+
+    def digest(self) -> int:
+        return self.state
 
+def hash(data: bytes, mode, length: int = 0) -> int:
     if mode == HashMode.FixedLength:
-        if length > 0:
-            data_len = min(length, len(data))
-            for i in range(data_len):
-                b = data[i]
-                hash_val.value = b + (hash_val.value >> 27) + (hash_val.value << 5)
-
-    elif mode == HashMode.NullTerminated:
-        for b in data:
-            if b == 0:
-                break
-            hash_val.value = b + (hash_val.value >> 27) + (hash_val.value << 5)
-
-    return hash_val.value
\ No newline at end of file
+        if length <= 0:
+            return HASH_SEED
+        return hash_update(HASH_SEED, data if length >= len(data) else data[:length])
+
+    if mode == HashMode.NullTerminated:
+        data = bytes(data)
+        end = data.find(0)
+        return hash_update(HASH_SEED, data if end < 0 else data[:end])
+
+    return HASH_SEED
+
+def store_file_hash(path: str, value: int, stat=None) -> None:
+    # The hash is only trusted while the file keeps the size and mtime it was computed for
+    stat = stat or os.stat(path)
+    write_atomic(path + HASH_SUFFIX, f"{stat.st_size} {stat.st_mtime_ns} {value}\n".encode("ascii"))
+
+def file_hash(path: str) -> int:
+    stat = os.stat(path)
+    try:
+        with open(path + HASH_SUFFIX, "r", encoding="ascii") as f:
+            size, mtime, value = (int(part) for part in f.read().split())
+        if (size, mtime) == (stat.st_size, stat.st_mtime_ns):
+            return value
+    except (OSError, ValueError):
+        pass
+
+    hasher = Hasher()
+    with open(path, "rb") as f:
+        while chunk := f.read(FILE_CHUNK):
+            hasher.update(chunk)
+
+    try:
+        store_file_hash(path, hasher.digest(), stat)
+    except OSError:
+        pass
+    return hasher.digest()
\ No newline at end of file
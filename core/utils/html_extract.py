@@ -0,0 +1,98 @@
+from html.parser import HTMLParser
+from typing import Iterable, Optional
+
+class StopParsing(Exception):
+    pass
+
+class Extractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+
+    def run(self, html: str) -> "Extractor":
+        # Handlers raise StopParsing as soon as they have what they need, so the rest of the page is never tokenized
+        try:
+            self.feed(html)
+            self.close()
+        except StopParsing:
+            pass
+        return self
+
+class InputValueExtractor(Extractor):
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+        self.value = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "input":
+            return
+
+        attrs = dict(attrs)
+        if attrs.get("name") == self.name:
+            self.value = attrs.get("value")
+            raise StopParsing
+
+class OnclickLinkExtractor(Extractor):
+    def __init__(self, onclicks: Iterable[str]):
+        super().__init__()
+        self.links = {onclick: None for onclick in onclicks}
+        self.remaining = set(self.links)
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+
+        attrs = dict(attrs)
+        onclick = attrs.get("onclick")
+        if onclick in self.remaining:
+            self.links[onclick] = attrs.get("href")
+            self.remaining.discard(onclick)
+            if not self.remaining:
+                raise StopParsing
+
+class ClassTextExtractor(Extractor):
+    def __init__(self, tag: str, class_name: str):
+        super().__init__()
+        self.tag = tag
+        self.class_name = class_name
+        self.depth = 0
+        self.parts = []
+        self.found = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag != self.tag:
+            return
+
+        if self.depth > 0:
+            self.depth += 1
+            return
+
+        classes = (dict(attrs).get("class") or "").split()
+        if self.class_name in classes:
+            self.found = True
+            self.depth = 1
+
+    def handle_endtag(self, tag):
+        if tag == self.tag and self.depth > 0:
+            self.depth -= 1
+            if self.depth == 0:
+                raise StopParsing
+
+    def handle_data(self, data):
+        if self.depth > 0:
+            data = data.strip()
+            if data:
+                self.parts.append(data)
+
+    @property
+    def text(self) -> Optional[str]:
+        return "".join(self.parts) if self.found else None
+
+def find_input_value(html: str, name: str) -> Optional[str]:
+    return InputValueExtractor(name).run(html).value
+
+def find_onclick_links(html: str, onclicks: Iterable[str]) -> dict[str, Optional[str]]:
+    return OnclickLinkExtractor(onclicks).run(html).links
+
+def find_class_text(html: str, tag: str, class_name: str) -> Optional[str]:
+    return ClassTextExtractor(tag, class_name).run(html).text
\ No newline at end of file
@@ -0,0 +1,126 @@
+import contextvars
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+ROOT = "gtbot"
+FORMAT = "%(asctime)s %(levelname)-7s %(name)s [%(bot)s] %(message)s"
+# How long stop waits for the writer to make room for its sentinel before dropping what is still queued
+STOP_TIMEOUT = 5
+
+# Username of the bot whose task is running, set by Bot.connect and Fleet.dispatch
+bot_context = contextvars.ContextVar("bot", default="-")
+
+def get_logger(category: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT}.{category}")
+
+class BotContextFilter(logging.Filter):
+    def filter(self, record):
+        record.bot = bot_context.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rates=None):
+        super().__init__()
+        # category -> keep one record in this many, warnings and errors are never sampled
+        self.rates = {}
+        self.seen = {}
+        for category, every in (rates or {}).items():
+            self.set_rate(category, every)
+
+    def set_rate(self, category: str, every: int) -> None:
+        name = f"{ROOT}.{category}"
+        if every <= 1:
+            self.rates.pop(name, None)
+        else:
+            self.rates[name] = every
+        self.seen[name] = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        every = self.rates.get(record.name)
+        if every is None:
+            return True
+
+        seen = self.seen[record.name]
+        self.seen[record.name] = seen + 1
+        return seen % every == 0
+
+class DroppingQueueHandler(QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The listener lives in this process, so formatting can wait for the writer thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class BoundedQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # The stock put_nowait raises on a full queue, which a slow stream leaves behind
+        try:
+            self.queue.put(self._sentinel, timeout=STOP_TIMEOUT)
+            return
+        except queue.Full:
+            pass
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        self.queue.put_nowait(self._sentinel)
+
+class LogWriter:
+    def __init__(self, level=logging.INFO, stream=None, queue_size=10000, sampling=None, fmt=FORMAT):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.running = False
+        self.sampling = SamplingFilter(sampling)
+
+        self.handler = DroppingQueueHandler(self.queue)
+        self.handler.addFilter(BotContextFilter())
+        self.handler.addFilter(self.sampling)
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(logging.Formatter(fmt))
+        self.listener = BoundedQueueListener(self.queue, output, respect_handler_level=False)
+
+        self.logger = logging.getLogger(ROOT)
+        self.logger.setLevel(level)
+        self.logger.propagate = False
+
+    @property
+    def dropped(self) -> int:
+        return self.handler.dropped
+
+    def start(self) -> "LogWriter":
+        if not self.running:
+            self.logger.addHandler(self.handler)
+            self.listener.start()
+            self.running = True
+        return self
+
+    def stop(self) -> None:
+        if self.running:
+            self.logger.removeHandler(self.handler)
+            try:
+                self.listener.stop()
+            finally:
+                self.running = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def setup_logging(level=logging.INFO, stream=None, queue_size=10000, sampling=None) -> LogWriter:
+    return LogWriter(level, stream, queue_size, sampling).start()
\ No newline at end of file
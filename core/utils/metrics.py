@@ -0,0 +1,136 @@
+import asyncio
+from bisect import bisect_left
+from functools import lru_cache
+
+PACKETS = "gtbot_packets_total"
+BYTES = "gtbot_packet_bytes_total"
+HANDLER_SECONDS = "gtbot_handler_seconds"
+SERVICE_SECONDS = "gtbot_enet_service_seconds"
+
+# name -> (type, help, label names)
+FAMILIES = {
+    PACKETS: ("counter", "Packets by direction, protocol layer and type.", ("direction", "kind", "type")),
+    BYTES: ("counter", "Payload bytes by direction, protocol layer and type.", ("direction", "kind", "type")),
+    HANDLER_SECONDS: ("histogram", "Time spent in packet handlers, including nested handlers.", ("kind", "type")),
+    SERVICE_SECONDS: ("histogram", "Time spent inside enet_host_service.", ()),
+}
+
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+@lru_cache(maxsize=1024)
+def type_name(keys, value) -> str:
+    if keys is not None:
+        try:
+            return keys(value).name
+        except ValueError:
+            pass
+    return str(value)
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return {"count": self.count, "sum": self.sum, "buckets": cumulative}
+
+class Metrics:
+    def __init__(self):
+        # (name, label values) -> int or Histogram
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name: str, labels: tuple = (), amount: int = 1) -> None:
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, labels: tuple, value: float) -> None:
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def snapshot(self) -> dict:
+        snapshot = {}
+        for (name, labels), value in self.counters.items():
+            snapshot.setdefault(name, {})[labels] = value
+        for (name, labels), histogram in self.histograms.items():
+            snapshot.setdefault(name, {})[labels] = histogram.snapshot()
+        return snapshot
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def format_labels(names, values, extra=()) -> str:
+    pairs = list(extra) + list(zip(names, values))
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+
+def render(sources) -> str:
+    # sources is an iterable of (extra labels, Metrics), e.g. ((("bot", "name"),), bot.metrics)
+    samples = {name: [] for name in FAMILIES}
+    for extra, metrics in sources:
+        for (name, labels), value in list(metrics.counters.items()):
+            samples[name].append(f"{name}{format_labels(FAMILIES[name][2], labels, extra)} {value}")
+
+        for (name, labels), histogram in list(metrics.histograms.items()):
+            label_names = FAMILIES[name][2]
+            for bound, count in histogram.snapshot()["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                samples[name].append(f"{name}_bucket{format_labels(label_names + ('le',), labels + (le,), extra)} {count}")
+            samples[name].append(f"{name}_sum{format_labels(label_names, labels, extra)} {histogram.sum}")
+            samples[name].append(f"{name}_count{format_labels(label_names, labels, extra)} {histogram.count}")
+
+    lines = []
+    for name, (metric_type, help_text, _) in FAMILIES.items():
+        if not samples[name]:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(samples[name])
+    return "\n".join(lines) + "\n"
+
+async def serve_metrics(render_text, host="127.0.0.1", port=9100) -> asyncio.Server:
+    # Bare bones HTTP/1.0 responder, runs on the fleet's event loop so metrics are read without locking
+    async def respond(reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request.split()
+            if len(parts) >= 2 and parts[0] == b"GET" and parts[1] in (b"/", b"/metrics"):
+                status = b"200 OK"
+                body = render_text().encode("utf-8")
+            else:
+                status = b"404 Not Found"
+                body = b"not found\n"
+
+            writer.write(
+                b"HTTP/1.0 " + status + b"\r\n"
+                b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(respond, host, port)
\ No newline at end of file
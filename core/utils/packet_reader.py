@@ -1,11 +1,10 @@
-import ctypes
 import struct
 
-def read_u32(pointer):
-    return ctypes.cast(pointer, ctypes.POINTER(ctypes.c_uint32)).contents.value
+def read_u32(data, offset: int = 0) -> int:
+    return struct.unpack_from("<I", data, offset)[0]
 
 class PacketReader:
-    def __init__(self, data: bytes):
+    def __init__(self, data: bytes | memoryview):
         self.data = data
         self.offset = 0
 
@@ -49,9 +48,9 @@ class PacketReader:
     def string_u8(self) -> str:
         length = self.u8()
         raw = self.read(length)
-        return raw.decode("utf-8", errors="ignore")
+        return str(raw, "utf-8", errors="ignore")
 
     def string_u16(self) -> str:
         length = self.u16()
         raw = self.read(length)
-        return raw.decode("utf-8", errors="ignore")
\ No newline at end of file
+        return str(raw, "utf-8", errors="ignore")
\ No newline at end of file
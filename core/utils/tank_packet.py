@@ -0,0 +1,152 @@
+import struct
+from math import copysign, inf
+
+TANK_PACKET = struct.Struct("<BBBBIiIfIfffffiiI")
+FIELD_CODES = TANK_PACKET.format[1:]
+FLT_MAX = struct.unpack("<f", struct.pack("<I", 0x7F7FFFFF))[0]
+
+def fit(value, code: str):
+    # What the ctypes field this replaced stored for value: ints wrap to their C width, floats past the range become inf
+    if code == "f":
+        return value if -FLT_MAX <= value <= FLT_MAX or value != value else copysign(inf, value)
+    bits = 8 if code == "B" else 32
+    value &= (1 << bits) - 1
+    if code == "i" and value >> 31:
+        value -= 1 << 32
+    return value
+
+class TankPacket:
+    __slots__ = (
+        "type",
+        "object_type",
+        "jump_count",
+        "animation_type",
+        "net_id",
+        "target_net_id",
+        "flags",
+        "float_variable",
+        "value",
+        "vector_x",
+        "vector_y",
+        "vector_x2",
+        "vector_y2",
+        "particle_rotation",
+        "int_x",
+        "int_y",
+        "extended_data",
+    )
+
+    size = TANK_PACKET.size
+
+    def __init__(
+        self,
+        type: int = 0,
+        object_type: int = 0,
+        jump_count: int = 0,
+        animation_type: int = 0,
+        net_id: int = 0,
+        target_net_id: int = 0,
+        flags: int = 0,
+        float_variable: float = 0.0,
+        value: int = 0,
+        vector_x: float = 0.0,
+        vector_y: float = 0.0,
+        vector_x2: float = 0.0,
+        vector_y2: float = 0.0,
+        particle_rotation: float = 0.0,
+        int_x: int = 0,
+        int_y: int = 0,
+        extended_data: bytes | memoryview = b"",
+    ):
+        self.type = type
+        self.object_type = object_type
+        self.jump_count = jump_count
+        self.animation_type = animation_type
+        self.net_id = net_id
+        self.target_net_id = target_net_id
+        self.flags = flags
+        self.float_variable = float_variable
+        self.value = value
+        self.vector_x = vector_x
+        self.vector_y = vector_y
+        self.vector_x2 = vector_x2
+        self.vector_y2 = vector_y2
+        self.particle_rotation = particle_rotation
+        self.int_x = int_x
+        self.int_y = int_y
+        self.extended_data = extended_data
+
+    @property
+    def extended_data_length(self) -> int:
+        return len(self.extended_data)
+
+    @classmethod
+    def decode(cls, buf: bytes | memoryview, offset: int = 0) -> "TankPacket":
+        packet = cls.__new__(cls)
+        (
+            packet.type,
+            packet.object_type,
+            packet.jump_count,
+            packet.animation_type,
+            packet.net_id,
+            packet.target_net_id,
+            packet.flags,
+            packet.float_variable,
+            packet.value,
+            packet.vector_x,
+            packet.vector_y,
+            packet.vector_x2,
+            packet.vector_y2,
+            packet.particle_rotation,
+            packet.int_x,
+            packet.int_y,
+            extended_data_length,
+        ) = TANK_PACKET.unpack_from(buf, offset)
+
+        # Slicing a memoryview borrows the caller's buffer, copy it to keep it past the handler
+        start = offset + TANK_PACKET.size
+        packet.extended_data = buf[start:start + extended_data_length]
+        return packet
+
+    def encoded_size(self) -> int:
+        return TANK_PACKET.size + len(self.extended_data)
+
+    def encode_into(self, buf: bytearray | memoryview, offset: int = 0) -> int:
+        extended_data_length = len(self.extended_data)
+        values = (
+            self.type,
+            self.object_type,
+            self.jump_count,
+            self.animation_type,
+            self.net_id,
+            self.target_net_id,
+            self.flags,
+            self.float_variable,
+            self.value,
+            self.vector_x,
+            self.vector_y,
+            self.vector_x2,
+            self.vector_y2,
+            self.particle_rotation,
+            self.int_x,
+            self.int_y,
+            extended_data_length,
+        )
+        try:
+            TANK_PACKET.pack_into(buf, offset, *values)
+        except (struct.error, OverflowError):
+            # Out of range fields are routine, net_id -1 for one, and wrap as they did in the ctypes struct
+            TANK_PACKET.pack_into(buf, offset, *map(fit, values, FIELD_CODES))
+
+        start = offset + TANK_PACKET.size
+        buf[start:start + extended_data_length] = self.extended_data
+        return start + extended_data_length
+
+    def encode(self) -> bytes:
+        buf = bytearray(self.encoded_size())
+        self.encode_into(buf)
+        return bytes(buf)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__ if name != "extended_data")
+        return f"TankPacket({fields}, extended_data_length={len(self.extended_data)})"
\ No newline at end of file
@@ -65,7 +65,7 @@ class VariantList:
         self.variants: List[Variant] = []
 
     @classmethod
-    def deserialize(cls, data: bytes) -> 'VariantList':
+    def deserialize(cls, data: bytes | memoryview) -> 'VariantList':
         if len(data) == 0:
             raise ValueError("Data is empty, cannot deserialize VariantList.")
         
@@ -90,47 +90,47 @@ class VariantList:
             if vtype == VariantType.FLOAT:
                 if offset + 4 > len(data):
                     raise ValueError("Not enough data for FLOAT variant.")
-                value = struct.unpack('<f', data[offset:offset+4])[0]
+                value = struct.unpack_from('<f', data, offset)[0]
                 offset += 4
                 variant = Variant(value, vtype)
 
             elif vtype == VariantType.STRING:
                 if offset + 4 > len(data):
                     raise ValueError("Not enough data for STRING length.")
-                str_len = struct.unpack('<I', data[offset:offset+4])[0]
+                str_len = struct.unpack_from('<I', data, offset)[0]
                 offset += 4
 
                 if offset + str_len > len(data):
                     raise ValueError("Not enough data for STRING content.")
-                value = data[offset:offset+str_len].decode('utf-8')
+                value = str(data[offset:offset+str_len], 'utf-8')
                 offset += str_len
                 variant = Variant(value, vtype)
 
             elif vtype == VariantType.VEC2:
                 if offset + 8 > len(data):
                     raise ValueError("Not enough data for VEC2 variant.")
-                x, y = struct.unpack('<ff', data[offset:offset+8])
+                x, y = struct.unpack_from('<ff', data, offset)
                 offset += 8
                 variant = Variant((x, y), vtype)
 
             elif vtype == VariantType.VEC3:
                 if offset + 12 > len(data):
                     raise ValueError("Not enough data for VEC3 variant.")
-                x, y, z = struct.unpack('<fff', data[offset:offset+12])
+                x, y, z = struct.unpack_from('<fff', data, offset)
                 offset += 12
                 variant = Variant((x, y, z), vtype)
 
             elif vtype == VariantType.UNSIGNED:
                 if offset + 4 > len(data):
                     raise ValueError("Not enough data for UNSIGNED variant.")
-                value = struct.unpack('<I', data[offset:offset+4])[0]
+                value = struct.unpack_from('<I', data, offset)[0]
                 offset += 4
                 variant = Variant(value, vtype)
 
             elif vtype == VariantType.SIGNED:
                 if offset + 4 > len(data):
                     raise ValueError("Not enough data for SIGNED variant.")
-                value = struct.unpack('<i', data[offset:offset+4])[0]
+                value = struct.unpack_from('<i', data, offset)[0]
                 offset += 4
                 variant = Variant(value, vtype)
 
@@ -141,6 +141,35 @@ class VariantList:
 
         return variant_list
 
+    def append(self, value, variant_type: VariantType) -> 'VariantList':
+        self.variants.append(Variant(value, variant_type))
+        return self
+
+    def serialize(self) -> bytes:
+        out = bytearray()
+        out.append(len(self.variants))
+
+        for index, variant in enumerate(self.variants):
+            out.append(index)
+            out.append(variant.variant_type)
+
+            if variant.variant_type == VariantType.FLOAT:
+                out += struct.pack('<f', variant.value)
+            elif variant.variant_type == VariantType.STRING:
+                raw = variant.value.encode('utf-8')
+                out += struct.pack('<I', len(raw))
+                out += raw
+            elif variant.variant_type == VariantType.VEC2:
+                out += struct.pack('<ff', *variant.value)
+            elif variant.variant_type == VariantType.VEC3:
+                out += struct.pack('<fff', *variant.value)
+            elif variant.variant_type == VariantType.UNSIGNED:
+                out += struct.pack('<I', variant.value)
+            elif variant.variant_type == VariantType.SIGNED:
+                out += struct.pack('<i', variant.value)
+
+        return bytes(out)
+
     def get(self, index: int) -> Optional[Variant]:
         if 0 <= index < len(self.variants):
             return self.variants[index]
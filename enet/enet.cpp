@@ -1 +1,14 @@
-#include "enet.h"
\ No newline at end of file
+#include "enet.h"
+
+extern "C" {
+
+// Growtopia's rolling hash, exported here so Python can verify a multi-megabyte items.dat without a per-byte loop.
+// Feed the returned state back in to hash a file in chunks, the first call starts from 0x55555555
+ENET_API enet_uint32 gt_hash_update(enet_uint32 state, const enet_uint8 * data, size_t length) {
+    for (size_t i = 0; i < length; ++i) {
+        state = data[i] + (state >> 27) + (state << 5);
+    }
+    return state;
+}
+
+}
\ No newline at end of file